@@ -0,0 +1,100 @@
+"""Add uuid shadow columns for users/notes/note_bodies ids
+
+Revision ID: 29f054cafb29
+Revises: c76986786e4c
+Create Date: 2026-10-18 22:06:31.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '29f054cafb29'
+down_revision: Union[str, None] = 'c76986786e4c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# varchar id kolonu -> uuid gölge kolonu. Expand adımı: eski kod çalışırken uygulanır, tablolar kilitlenmez.
+# Geçiş 718797c161d0'da (contract) kısa bir kilitle yapılır.
+SHADOW_COLUMNS = {
+    'users': ['id'],
+    'notes': ['id', 'user_id'],
+    'note_bodies': ['note_id'],
+}
+
+# contract'ta PK'ye / index'lere dönüşecek gölge index'ler (isimler contract'ta değiştirilir)
+SHADOW_INDEXES = [
+    ('users_id_uuid_key', 'users', ['id_uuid'], True),
+    ('notes_id_uuid_key', 'notes', ['id_uuid'], True),
+    ('note_bodies_note_id_uuid_key', 'note_bodies', ['note_id_uuid'], True),
+    ('ix_notes_user_id_uuid_created_at_id_uuid', 'notes', ['user_id_uuid', 'created_at', 'id_uuid'], False),
+    ('ix_notes_created_at_id_uuid', 'notes', ['created_at', 'id_uuid'], False),
+    ('ix_notes_user_id_uuid_updated_at', 'notes', ['user_id_uuid', 'updated_at'], False),
+]
+
+
+def upgrade() -> None:
+    for table, columns in SHADOW_COLUMNS.items():
+        for column in columns:
+            # nullable kolon tabloyu yeniden yazmaz
+            op.add_column(table, sa.Column(f'{column}_uuid', postgresql.UUID(as_uuid=False), nullable=True))
+        # eski kodun yazdığı / güncellediği satırlar trigger ile doldurulur
+        assignments = " ".join(f"NEW.{column}_uuid := NEW.{column}::uuid;" for column in columns)
+        op.execute(
+            f"CREATE FUNCTION {table}_sync_uuid() RETURNS trigger AS $$ "
+            f"BEGIN {assignments} RETURN NEW; END $$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_uuid BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_sync_uuid()"
+        )
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # mevcut satırlar PK sırasıyla batch batch doldurulur (her batch ayrı transaction, kısa row lock'lar)
+        for table, columns in SHADOW_COLUMNS.items():
+            key = columns[0]
+            assignments = ", ".join(f"{column}_uuid = {column}::uuid" for column in columns)
+            after = ""
+            while True:
+                keys = bind.execute(
+                    sa.text(f"SELECT {key} FROM {table} WHERE {key} > :after ORDER BY {key} LIMIT :batch_size"),
+                    {"after": after, "batch_size": BACKFILL_BATCH_SIZE},
+                ).scalars().all()
+                if not keys:
+                    break
+                bind.execute(
+                    sa.text(f"UPDATE {table} SET {assignments} WHERE {key} >= :first AND {key} <= :last AND {key}_uuid IS NULL"),
+                    {"first": keys[0], "last": keys[-1]},
+                )
+                after = keys[-1]
+
+        # NOT NULL'a contract'ta tablo taranmadan geçmek için: NOT VALID CHECK + VALIDATE
+        # (VALIDATE yazmaları bloklamaz, SET NOT NULL doğrulanmış CHECK'i görünce taramaz)
+        for table, columns in SHADOW_COLUMNS.items():
+            for column in columns:
+                constraint = f'{table}_{column}_uuid_not_null'
+                op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column}_uuid IS NOT NULL) NOT VALID")
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+
+        # CONCURRENTLY transaction içinde çalışamaz, tablo kilitlenmeden index oluşturulur
+        for name, table, columns, unique in SHADOW_INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    # IF EXISTS: 718797c161d0 downgrade'i tabloları varchar'a döndürür, gölge kolonlar o noktada yoktur
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in reversed(SHADOW_INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    for table, columns in SHADOW_COLUMNS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_uuid ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_sync_uuid()")
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}_uuid")
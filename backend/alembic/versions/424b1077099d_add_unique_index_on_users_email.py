@@ -0,0 +1,30 @@
+"""Add unique index on users.email
+
+Revision ID: 424b1077099d
+Revises: 79f63b94e8e7
+Create Date: 2026-10-18 11:14:05.502187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '424b1077099d'
+down_revision: Union[str, None] = '79f63b94e8e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # get_current_user her istekte email ile arar; index yoksa seq scan olur.
+    # Duplicate email varsa index oluşturma başarısız olur, önce temizlenmeli.
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_users_email'), table_name='users', postgresql_concurrently=True)
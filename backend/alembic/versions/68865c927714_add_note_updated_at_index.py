@@ -0,0 +1,29 @@
+"""Add note updated_at index
+
+Revision ID: 68865c927714
+Revises: fe6ded174ce3
+Create Date: 2026-10-18 16:21:09.552187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '68865c927714'
+down_revision: Union[str, None] = 'fe6ded174ce3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY transaction içinde çalışamaz, tablo kilitlenmeden index oluşturulur
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notes_user_id_updated_at', 'notes', ['user_id', 'updated_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notes_user_id_updated_at', table_name='notes', postgresql_concurrently=True)
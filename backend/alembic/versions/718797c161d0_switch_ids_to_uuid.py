@@ -0,0 +1,108 @@
+"""Switch ids to native uuid, drop redundant id indexes
+
+Revision ID: 718797c161d0
+Revises: 29f054cafb29
+Create Date: 2026-10-18 22:31:04.227613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '718797c161d0'
+down_revision: Union[str, None] = '29f054cafb29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# gölge index -> son ismi (eski varchar index'leri kolonlarıyla birlikte düşer)
+RENAMED_INDEXES = {
+    'ix_notes_user_id_uuid_created_at_id_uuid': 'ix_notes_user_id_created_at_id',
+    'ix_notes_created_at_id_uuid': 'ix_notes_created_at_id',
+    'ix_notes_user_id_uuid_updated_at': 'ix_notes_user_id_updated_at',
+}
+
+# küçük / sürekli boşalan tablolar: gölge kolon yerine yerinde dönüştürülür (kısa rewrite)
+CONVERTED_COLUMNS = {
+    'outbox': ['id', 'user_id'],
+    'note_stat_deltas': ['id', 'user_id'],
+    'note_stats': ['user_id'],
+}
+
+# PK ile aynı kolondaki gereksiz index'ler (initial migration'daki index=True)
+REDUNDANT_INDEXES = {
+    'ix_users_id': ('users', 'id'),
+    'ix_notes_id': ('notes', 'id'),
+    'ix_outbox_id': ('outbox', 'id'),
+    'ix_note_stat_deltas_id': ('note_stat_deltas', 'id'),
+}
+
+
+def swap_column(table: str, column: str) -> None:
+    # 29f054cafb29'daki CHECK doğrulanmış olduğu için SET NOT NULL tabloyu taramaz; eski kolonla
+    # birlikte PK'si ve index'leri düşer
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column}_uuid SET NOT NULL")
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_{column}_uuid_not_null")
+    op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    op.execute(f"ALTER TABLE {table} RENAME COLUMN {column}_uuid TO {column}")
+
+
+def upgrade() -> None:
+    # Contract adımı: tüm işlemler katalog değişikliği (tablo yeniden yazılmaz, index'ler expand'de hazır),
+    # ACCESS EXCLUSIVE kilitler sadece transaction süresince tutulur. Kilit alınamazsa bekleyip yazmaları
+    # bloklamak yerine hata verir, migration tekrar çalıştırılır.
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("ALTER TABLE note_bodies DROP CONSTRAINT note_bodies_note_id_fkey")
+    op.execute("ALTER TABLE notes DROP CONSTRAINT notes_user_id_fkey")
+    for table in ('users', 'notes', 'note_bodies'):
+        op.execute(f"DROP TRIGGER {table}_sync_uuid ON {table}")
+        op.execute(f"DROP FUNCTION {table}_sync_uuid()")
+
+    swap_column('users', 'id')
+    op.execute("ALTER TABLE users ADD CONSTRAINT users_pkey PRIMARY KEY USING INDEX users_id_uuid_key")
+    swap_column('notes', 'id')
+    swap_column('notes', 'user_id')
+    op.execute("ALTER TABLE notes ADD CONSTRAINT notes_pkey PRIMARY KEY USING INDEX notes_id_uuid_key")
+    for old_name, new_name in RENAMED_INDEXES.items():
+        op.execute(f"ALTER INDEX {old_name} RENAME TO {new_name}")
+    swap_column('note_bodies', 'note_id')
+    op.execute("ALTER TABLE note_bodies ADD CONSTRAINT note_bodies_pkey PRIMARY KEY USING INDEX note_bodies_note_id_uuid_key")
+
+    for name, (table, _) in REDUNDANT_INDEXES.items():
+        if table in CONVERTED_COLUMNS:
+            op.drop_index(name, table_name=table)
+    for table, columns in CONVERTED_COLUMNS.items():
+        op.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(f"ALTER COLUMN {column} TYPE uuid USING {column}::uuid" for column in columns)
+        )
+
+    # FK'ler NOT VALID eklenir (yeni yazmalar hemen kontrol edilir), mevcut satırlar kilitler
+    # bırakıldıktan sonra doğrulanır (VALIDATE yazmaları bloklamaz)
+    op.execute("ALTER TABLE notes ADD CONSTRAINT notes_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id) NOT VALID")
+    op.execute(
+        "ALTER TABLE note_bodies ADD CONSTRAINT note_bodies_note_id_fkey FOREIGN KEY (note_id) "
+        "REFERENCES notes (id) ON DELETE CASCADE NOT VALID"
+    )
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE notes VALIDATE CONSTRAINT notes_user_id_fkey")
+        op.execute("ALTER TABLE note_bodies VALIDATE CONSTRAINT note_bodies_note_id_fkey")
+
+
+def downgrade() -> None:
+    # offline: tablolar varchar'a yeniden yazılır (gölge kolonlar / trigger'lar geri gelmez)
+    op.execute("ALTER TABLE note_bodies DROP CONSTRAINT note_bodies_note_id_fkey")
+    op.execute("ALTER TABLE notes DROP CONSTRAINT notes_user_id_fkey")
+    for table, columns in {'users': ['id'], 'notes': ['id', 'user_id'], 'note_bodies': ['note_id'], **CONVERTED_COLUMNS}.items():
+        op.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(f"ALTER COLUMN {column} TYPE varchar USING {column}::text" for column in columns)
+        )
+    op.execute("ALTER TABLE notes ADD CONSTRAINT notes_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute(
+        "ALTER TABLE note_bodies ADD CONSTRAINT note_bodies_note_id_fkey FOREIGN KEY (note_id) "
+        "REFERENCES notes (id) ON DELETE CASCADE"
+    )
+    for name, (table, column) in REDUNDANT_INDEXES.items():
+        op.create_index(name, table, [column], unique=False)
@@ -0,0 +1,38 @@
+"""Add outbox note_count, replace lane/user_id index
+
+Revision ID: 74b94dd958c3
+Revises: d3f7f39706aa
+Create Date: 2026-10-19 11:02:37.551820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '74b94dd958c3'
+down_revision: Union[str, None] = 'd3f7f39706aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # server default'lu kolon tabloyu yeniden yazmaz; outbox küçük, mevcut summarize event'leri tek UPDATE ile
+    op.add_column('outbox', sa.Column('note_count', sa.Integer(), server_default='1', nullable=False))
+    op.execute(
+        "UPDATE outbox SET note_count = json_array_length(args -> 0) "
+        "WHERE task_name = 'worker.summarize_notes_batch' AND json_array_length(args -> 0) > 0"
+    )
+    # round robin artık lane'in en eski event'leri üzerinde hesaplanıyor
+    with op.get_context().autocommit_block():
+        op.create_index('ix_outbox_lane_created_at_id', 'outbox', ['lane', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_outbox_lane_user_id_created_at', table_name='outbox', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_outbox_lane_user_id_created_at', 'outbox', ['lane', 'user_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_outbox_lane_created_at_id', table_name='outbox', postgresql_concurrently=True)
+    op.drop_column('outbox', 'note_count')
@@ -0,0 +1,33 @@
+"""Add note pagination indexes
+
+Revision ID: 79f63b94e8e7
+Revises: 2c33b1f4cf41
+Create Date: 2026-10-18 10:02:41.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '79f63b94e8e7'
+down_revision: Union[str, None] = '2c33b1f4cf41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY transaction içinde çalışamaz, tablo kilitlenmeden index oluşturulur
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notes_user_id_created_at_id', 'notes', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_notes_created_at_id', 'notes', ['created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_notes_status_created_at', 'notes', ['status', 'created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notes_status_created_at', table_name='notes', postgresql_concurrently=True)
+        op.drop_index('ix_notes_created_at_id', table_name='notes', postgresql_concurrently=True)
+        op.drop_index('ix_notes_user_id_created_at_id', table_name='notes', postgresql_concurrently=True)
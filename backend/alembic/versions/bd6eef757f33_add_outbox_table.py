@@ -0,0 +1,44 @@
+"""Add outbox table
+
+Revision ID: bd6eef757f33
+Revises: 424b1077099d
+Create Date: 2026-10-18 13:40:22.731946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bd6eef757f33'
+down_revision: Union[str, None] = '424b1077099d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox',
+    sa.Column('task_name', sa.String(), nullable=False),
+    sa.Column('args', sa.JSON(), nullable=False),
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_id'), 'outbox', ['id'], unique=False)
+    op.create_index('ix_outbox_created_at', 'outbox', ['created_at'], unique=False)
+
+    # migration öncesi QUEUED kalmış notlar için summarize event'i yazılır
+    op.execute(
+        "INSERT INTO outbox (id, task_name, args, created_at, updated_at) "
+        "SELECT id, 'worker.summarize_notes_batch', json_build_array(json_build_array(id)), now(), now() "
+        "FROM notes WHERE status = 'QUEUED'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_created_at', table_name='outbox')
+    op.drop_index(op.f('ix_outbox_id'), table_name='outbox')
+    op.drop_table('outbox')
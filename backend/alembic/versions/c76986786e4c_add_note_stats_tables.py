@@ -0,0 +1,57 @@
+"""Add note_stats tables
+
+Revision ID: c76986786e4c
+Revises: f7a23d5e981c
+Create Date: 2026-10-18 20:41:17.392856
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c76986786e4c'
+down_revision: Union[str, None] = 'f7a23d5e981c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# notes.status ile aynı enum tipi, yeniden oluşturulmaz
+status_enum = postgresql.ENUM('QUEUED', 'IN_PROGRESS', 'COMPLETED', 'FAILED', name='status', create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table('note_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('status', status_enum, nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('completion_seconds', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'status')
+    )
+    op.create_table('note_stat_deltas',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('status', status_enum, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('completion_seconds', sa.Float(), nullable=False),
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_note_stat_deltas_id'), 'note_stat_deltas', ['id'], unique=False)
+    # ilk sayım; deploy sırasında eski kodun yaptığı değişiklikleri maintenance process'inin
+    # başlangıçtaki reconcile'ı düzeltir
+    op.execute(
+        "INSERT INTO note_stats (user_id, status, count, completion_seconds) "
+        "SELECT user_id, status, count(*), "
+        "COALESCE(sum(CASE WHEN status = 'COMPLETED' THEN EXTRACT(EPOCH FROM updated_at - created_at) ELSE 0 END), 0) "
+        "FROM notes GROUP BY user_id, status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_note_stat_deltas_id'), table_name='note_stat_deltas')
+    op.drop_table('note_stat_deltas')
+    op.drop_table('note_stats')
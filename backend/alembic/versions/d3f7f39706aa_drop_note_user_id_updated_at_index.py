@@ -0,0 +1,28 @@
+"""Drop ix_notes_user_id_updated_at
+
+Revision ID: d3f7f39706aa
+Revises: 718797c161d0
+Create Date: 2026-10-19 10:14:52.903417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f7f39706aa'
+down_revision: Union[str, None] = '718797c161d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # liste ETag'i artık sayfa satırlarından üretiliyor, (count, max(updated_at)) sorgusu yok
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notes_user_id_updated_at', table_name='notes', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notes_user_id_updated_at', 'notes', ['user_id', 'updated_at'], unique=False, postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""Add note search_vector
+
+Revision ID: f7a23d5e981c
+Revises: ffb497d0c27f
+Create Date: 2026-10-18 19:12:05.604131
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a23d5e981c'
+down_revision: Union[str, None] = 'ffb497d0c27f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    # nullable kolon tabloyu yeniden yazmaz
+    op.add_column('notes', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    # mevcut COMPLETED notlar batch'ler halinde doldurulur (her batch ayrı transaction, tablo kilitlenmez).
+    # Sıkıştırılmış (note_bodies) notlarda raw_text "" olduğu için sadece summary index'lenir.
+    with op.get_context().autocommit_block():
+        backfill = sa.text(
+            "UPDATE notes SET search_vector = to_tsvector(CAST(:config AS regconfig), left(raw_text, :max_chars) || ' ' || summary) "
+            "WHERE id IN (SELECT id FROM notes WHERE search_vector IS NULL AND status = 'COMPLETED' LIMIT :batch_size)"
+        )
+        params = {
+            "config": os.getenv('SEARCH_TEXT_CONFIG', 'english'),
+            "max_chars": int(os.getenv('SEARCH_MAX_DOCUMENT_CHARS', 100_000)),
+            "batch_size": BACKFILL_BATCH_SIZE,
+        }
+        while op.get_bind().execute(backfill, params).rowcount:
+            pass
+        # CONCURRENTLY transaction içinde çalışamaz, tablo kilitlenmeden index oluşturulur
+        op.create_index('ix_notes_search_vector', 'notes', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notes_search_vector', table_name='notes', postgresql_using='gin', postgresql_concurrently=True)
+    op.drop_column('notes', 'search_vector')
@@ -0,0 +1,35 @@
+"""Add note_bodies table
+
+Revision ID: fe6ded174ce3
+Revises: bd6eef757f33
+Create Date: 2026-10-18 15:02:47.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe6ded174ce3'
+down_revision: Union[str, None] = 'bd6eef757f33'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NOTE_BODY_STORAGE=zstd iken yeni notların text'i burada tutulur; mevcut notlar inline kalır
+    op.create_table('note_bodies',
+    sa.Column('note_id', sa.String(), nullable=False),
+    sa.Column('codec', sa.String(), nullable=False),
+    sa.Column('raw_size', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('note_id')
+    )
+
+
+def downgrade() -> None:
+    # sıkıştırılmış notlar downgrade'den önce inline'a taşınmalıdır
+    op.drop_table('note_bodies')
@@ -0,0 +1,34 @@
+"""Add outbox lane and user_id
+
+Revision ID: ffb497d0c27f
+Revises: 68865c927714
+Create Date: 2026-10-18 18:02:41.318275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ffb497d0c27f'
+down_revision: Union[str, None] = '68865c927714'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # nullable / server default'lu kolonlar tabloyu yeniden yazmaz
+    op.add_column('outbox', sa.Column('user_id', sa.String(), nullable=True))
+    op.add_column('outbox', sa.Column('lane', sa.String(), server_default='default', nullable=False))
+    # CONCURRENTLY transaction içinde çalışamaz, tablo kilitlenmeden index oluşturulur
+    with op.get_context().autocommit_block():
+        op.create_index('ix_outbox_lane_user_id_created_at', 'outbox', ['lane', 'user_id', 'created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_outbox_lane_user_id_created_at', table_name='outbox', postgresql_concurrently=True)
+    op.drop_column('outbox', 'lane')
+    op.drop_column('outbox', 'user_id')
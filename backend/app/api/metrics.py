@@ -0,0 +1,72 @@
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.metrics import MetricsMiddleware, PoolCollector, QueueDepthCollector, StatsCollector, metrics_payload, register_collector
+from app.core.settings import settings
+
+_collectors_registered = False
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    # scrape sırasında Redis LLEN ve stats okunur, event loop bloklanmaz
+    payload, content_type = await run_in_threadpool(metrics_payload)
+    return Response(payload, media_type=content_type)
+
+
+def default_queue_names() -> list:
+    # celery import'u (~100ms) API startup'ından ilk scrape'e ertelenir
+    from app.core.celery_app import celery_app
+
+    return list(dict.fromkeys([settings.SUMMARY_FAST_QUEUE, celery_app.conf.task_default_queue]))
+
+
+def register_api_collectors() -> None:
+    # process başına bir kez (registry global)
+    global _collectors_registered
+    if _collectors_registered:
+        return
+    _collectors_registered = True
+
+    from app.core.hashing import get_hashing_stats
+    from app.core.note_events import note_event_hub
+    from app.core.principal_cache import principal_cache
+    from app.core.summary_cache import summary_cache
+    from app.db.replicas import async_replica_engines, replica_engines, replica_router, replicas_enabled
+    from app.db.session import async_engine, engine
+
+    pools = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    for index, replica_engine in enumerate(replica_engines):
+        pools[f"replica{index}-sync"] = replica_engine.pool
+    for index, replica_engine in enumerate(async_replica_engines):
+        pools[f"replica{index}-async"] = replica_engine.sync_engine.pool
+    register_collector(PoolCollector(pools))
+    if replicas_enabled():
+        register_collector(StatsCollector(
+            "db_replica", replica_router.get_stats,
+            counters=("replica_reads", "primary_reads", "pinned_reads", "lag_fallbacks", "miss_fallbacks"),
+        ))
+    # kuyruk derinliği sadece Redis broker'ında okunabilir (memory:// vb. değil)
+    if settings.CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+        register_collector(QueueDepthCollector(settings.CELERY_BROKER_URL, default_queue_names))
+    register_collector(StatsCollector(
+        "password_hashing", get_hashing_stats,
+        counters=("submitted", "completed", "rejected", "failed", "wait_seconds_total", "run_seconds_total"),
+    ))
+    register_collector(StatsCollector("principal_cache", principal_cache.get_stats, counters=("hits", "misses", "evictions", "invalidations")))
+    register_collector(StatsCollector(
+        "summary_cache", summary_cache.get_stats,
+        counters=("local_hits", "redis_hits", "misses", "local_evictions", "redis_errors", "stores"),
+    ))
+    register_collector(StatsCollector(
+        "note_events", note_event_hub.get_stats, counters=("received", "delivered", "dropped", "reconnects"),
+    ))
+
+
+def setup_metrics(app: FastAPI) -> None:
+    if not settings.METRICS_ENABLED:
+        return
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    register_api_collectors()
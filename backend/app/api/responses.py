@@ -0,0 +1,44 @@
+import hashlib
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class UploadProgressResponse(StreamingResponse):
+    # StreamingResponse disconnect'i dinlerken request body mesajlarını tüketir.
+    # Bu response, generator'ın request body'yi okurken progress yazabilmesi için
+    # disconnect dinlemez; client koparsa request.stream() ClientDisconnect fırlatır.
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+
+class RawJSONResponse(Response):
+    # önceden serialize edilmiş JSON bytes (bkz. schemas.notes.note_rows_adapter), tekrar encode edilmez
+    media_type = "application/json"
+
+
+def make_etag(*parts) -> str:
+    # strong ETag: version bilgisi + representation'ı belirleyen parametreler (view, excerpt, ...)
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match weak comparison kullanır (RFC 9110), W/ prefix'i yok sayılır
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(headers: dict) -> Response:
+    # 304: body yok, ETag ve Cache-Control tekrar gönderilir
+    return Response(status_code=304, headers=headers)
@@ -1,19 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.hashing import PasswordHasherBusy
 from app.core.security import create_access_token
-from app.db.session import get_db
-from app.crud.users_crud import authenticate_user, create_user, get_user_by_email
+from app.db.replicas import mark_primary_write
+from app.db.session import get_async_db
+from app.crud.users_crud import authenticate_user_async, create_user_async, get_user_by_email_async
 from app.schemas.users import UserCreate, UserResponse
 
 router = APIRouter()
 
-@router.post("/signup", response_model=UserResponse)
-async def signup(user_in: UserCreate, db: Session = Depends(get_db)):
+
+def raise_hasher_busy():
+    # hashing pool dolu - auth yükü diğer istekleri aç bırakmasın diye hemen reddedilir
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+@router.post("/signup", response_model=UserResponse, dependencies=[Depends(mark_primary_write)])
+async def signup(user_in: UserCreate, db: Session | AsyncSession = Depends(get_async_db)):
     """Create new user account"""
     # Check if user already exists
-    existing_user = get_user_by_email(db, email=user_in.email)
+    existing_user = await get_user_by_email_async(db, email=user_in.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -21,13 +34,25 @@ async def signup(user_in: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    user = create_user(db, user_in=user_in) 
+    try:
+        user = await create_user_async(db, user_in=user_in)
+    except PasswordHasherBusy:
+        raise_hasher_busy()
+    except IntegrityError:
+        # aynı anda gelen iki signup - users.email unique index'i yakalar
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists"
+        )
     return user
 
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends(),
-                db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password) # kullanıcının email ve şifresi doğru mu kontrol ediliyor
+                db: Session | AsyncSession = Depends(get_async_db)):
+    try:
+        user = await authenticate_user_async(db, form_data.username, form_data.password) # kullanıcının email ve şifresi doğru mu kontrol ediliyor
+    except PasswordHasherBusy:
+        raise_hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
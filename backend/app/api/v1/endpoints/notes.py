@@ -1,108 +1,416 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from datetime import datetime
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from typing import Any, AsyncIterator, List, Optional, Union
 
-from app.db.session import get_db
-from app.models.notes import Note, Status
-from app.schemas.notes import NoteCreate, NoteResponse
-from app.core.security import get_current_user, get_current_admin_user
-from app.schemas.users import Role, User
-from app.core.celery_app import celery_app
+from app.api.responses import RawJSONResponse, UploadProgressResponse, etag_matches, make_etag, not_modified
+from app.core.note_events import note_event, note_event_hub, publish_note_events
+from app.core.settings import settings
+from app.core.summary_cache import summary_cache
+from app.db.replicas import get_async_read_db, mark_primary_write, with_primary_fallback
+from app.db.session import async_session_scope, get_async_db
+from app.crud.note_stats_crud import get_note_stats_async
+from app.crud.notes_crud import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    bulk_create_notes_async,
+    bulk_delete_notes_async,
+    create_note_async,
+    delete_note_async,
+    get_note_async,
+    get_note_owner_async,
+    get_note_version_async,
+    get_notes_page_async,
+    page_version,
+    get_notes_page_version_async,
+    search_notes_async,
+)
+from app.models.base import is_valid_id
+from app.models.notes import Status
+from app.schemas.notes import (
+    NoteBulkDelete,
+    NoteBulkDeleteResponse,
+    NoteCreate,
+    NoteResponse,
+    NoteStatsResponse,
+    NoteSummaryResponse,
+    NoteView,
+    note_rows_adapter,
+    note_summary_rows_adapter,
+)
+from app.core.security import authenticate_stream_token, get_current_user, get_current_admin_user, get_current_user_for_stream
+from app.schemas.users import User
 
 router = APIRouter()
 
 
-@router.post("/", response_model=NoteResponse)
+@router.post("/", response_model=NoteResponse, dependencies=[Depends(mark_primary_write)])
 async def create_note(
     note_in: NoteCreate,
-    db: Session = Depends(get_db),
+    db: Session | AsyncSession = Depends(get_async_db),
     current_user:User = Depends(get_current_user)
 ):
-    # Create note with QUEUED status
-    db_note = Note(
-        raw_text=note_in.raw_text,
-        summary="",  # Will be filled by background job
-        status=Status.QUEUED,
-        user_id=current_user.id
-    )
-    db.add(db_note)
-    db.commit()
-    db.refresh(db_note)
+    # aynı metin daha önce özetlendiyse not direkt COMPLETED olur
+    cached_summary = await run_in_threadpool(summary_cache.get, note_in.raw_text)
     
-    # Queue background job for AI summarization
-    try:
-        celery_app.send_task('worker.summarize_note', args=[db_note.id])
-        print(f"Task queued for note {db_note.id}")
-    except Exception as e:
-        # If we can't queue the job, mark as FAILED
-        print(f"Failed to queue summarization job: {e}")
-        db_note.status = Status.FAILED
-        db.commit()
-        print(f"Updated note {db_note.id} status to FAILED")
+    # Create note with QUEUED status - tek commit, broker I/O yok
+    db_note = await create_note_async(db, user_id=current_user.id, raw_text=note_in.raw_text, summary=cached_summary)
+    if cached_summary is not None:
+        # worker'a gitmeyen not: COMPLETED event'i burada yayınlanır
+        await run_in_threadpool(publish_note_events, [note_event(db_note.id, db_note.user_id, db_note.status, db_note.updated_at)])
     
+    # AI summarization task'ı outbox'ta; broker'a outbox relay gönderir (worker/outbox_relay.py)
     return db_note
 
 
-@router.get("/", response_model=List[NoteResponse])
-async def get_notes(
-    db: Session = Depends(get_db),
+async def iter_ndjson(request: Request) -> AsyncIterator[bytes]:
+    # NDJSON satır satır stream edilir, bellekte sadece yarım kalan satır tutulur
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def iter_list(items: list) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def ingest_notes(items: AsyncIterator[Any], user_id: str) -> AsyncIterator[bytes]:
+    # her chunk notları ve outbox event'leri ile ayrı transaction'da yazılır; her chunk sonrası
+    # {"chunk", "ids", "errors", "inserted"} satırı, en sonda {"done": true, ...} yazılır
+    chunk_size = settings.BULK_INSERT_CHUNK_SIZE
+    inserted = 0
+    failed = 0
+    chunk_index = 0
+    index = 0
+    raw_texts: List[str] = []
+    errors: List[dict] = []
+
+    async with async_session_scope() as db:
+
+        async def flush() -> bytes:
+            nonlocal inserted, chunk_index, raw_texts, errors
+            ids = []
+            if raw_texts:
+                summaries = await run_in_threadpool(summary_cache.get_many, raw_texts)
+                ids = await bulk_create_notes_async(db, user_id, raw_texts, summaries)
+                # cache'ten COMPLETED gelenler worker'a gitmez, event'leri burada yayınlanır
+                completed = [note_event(note_id, user_id, Status.COMPLETED) for note_id, summary in zip(ids, summaries) if summary is not None]
+                if completed:
+                    await run_in_threadpool(publish_note_events, completed)
+            inserted += len(ids)
+            line = {"chunk": chunk_index, "ids": ids, "errors": errors, "inserted": inserted}
+            chunk_index += 1
+            raw_texts, errors = [], []
+            return (json.dumps(line) + "\n").encode()
+
+        async for item in items:
+            try:
+                if isinstance(item, bytes):
+                    note_in = NoteCreate.model_validate_json(item)
+                else:
+                    note_in = NoteCreate.model_validate(item)
+                raw_texts.append(note_in.raw_text)
+            except ValidationError as e:
+                failed += 1
+                errors.append({"index": index, "error": e.errors(include_url=False, include_context=False)})
+            index += 1
+            if len(raw_texts) + len(errors) >= chunk_size:
+                yield await flush()
+        if raw_texts or errors:
+            yield await flush()
+
+    yield (json.dumps({"done": True, "inserted": inserted, "failed": failed}) + "\n").encode()
+
+
+@router.post("/bulk", dependencies=[Depends(mark_primary_write)])
+async def create_notes_bulk(
+    request: Request,
     current_user:User = Depends(get_current_user)
 ):
-    if current_user.role == Role.ADMIN:
-        # Admins can see all notes
-        notes = db.query(Note).all()
+    # JSON array veya NDJSON (Content-Type: application/x-ndjson) kabul eder.
+    # Sonuç NDJSON olarak chunk chunk stream edilir: her satır o chunk'ın note id'leri.
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = iter_ndjson(request)
     else:
-        # Agents and others can only see their own notes
-        notes = db.query(Note).filter(Note.user_id == current_user.id).all()
+        try:
+            body = json.loads(await request.body())
+        except ValueError:
+            body = None
+        if not isinstance(body, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array or NDJSON stream of notes"
+            )
+        items = iter_list(body)
     
+    return UploadProgressResponse(ingest_notes(items, current_user.id))
+
+
+def render_view(notes: list, view: NoteView) -> list:
+    # view=summary'de raw_text defer edilmiş (raiseload), NoteResponse'a verilmeden önce dönüştürülür
+    if view == NoteView.SUMMARY:
+        return [NoteSummaryResponse.model_validate(note) for note in notes]
     return notes
 
 
-@router.get("/{note_id}", response_model=NoteResponse)
-async def get_note(
-    note_id: str,
-    db: Session = Depends(get_db),
-    current_user:User = Depends(get_current_user)
-):
-    note = db.query(Note).filter(Note.id == note_id).first()
-    
-    if not note:
+def note_cache_control(note_status: Status) -> str:
+    # COMPLETED notlar bir daha değişmez; diğerleri her seferinde ETag ile doğrulanır
+    if note_status == Status.COMPLETED:
+        return f"private, max-age={settings.NOTE_CACHE_MAX_AGE_SECONDS}"
+    return "private, no-cache"
+
+
+def ensure_note_id(note_id: str) -> None:
+    # id kolonu uuid: geçersiz id sorguya girmeden 404 (Postgres'te cast hatası olurdu)
+    if not is_valid_id(note_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Note not found"
         )
-    
-    # Check permissions - agents can only see their own notes
-    if current_user.role != Role.ADMIN and note.user_id != current_user.id:
+
+
+async def note_access_error(db: Session | AsyncSession, note_id: str, action: str = "access") -> HTTPException:
+    # sorgular sahiplik koşuluyla çalışır; boş dönerse not ya yok ya da başkasının (ayrım sadece bu yolda)
+    owner = await with_primary_fallback(db, get_note_owner_async, note_id)
+    if owner is None:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found"
+        )
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"Not enough permissions to {action} this note"
+    )
+
+
+@router.get("/", response_model=Union[List[NoteResponse], List[NoteSummaryResponse]])
+async def get_notes(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status_filter: Optional[Status] = Query(None, alias="status"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    view: NoteView = NoteView.FULL,
+    excerpt: Optional[int] = Query(None, ge=1, le=settings.NOTE_EXCERPT_MAX_CHARS),
+    db: Session | AsyncSession = Depends(get_async_read_db),
+    current_user:User = Depends(get_current_user)
+):
+    # Admins can see all notes, agents only their own (scoping is in notes_crud)
+    filters = dict(cursor=cursor, status=status_filter, created_after=created_after, created_before=created_before)
+    try:
+        # If-None-Match varsa önce sayfanın sadece (id, updated_at)'leri okunur, değişmediyse body yüklenmez
+        if request.headers.get("if-none-match"):
+            version = await get_notes_page_version_async(db, current_user, limit, **filters)
+            etag = make_etag(current_user.id, current_user.role.value, version, request.url.query)
+            if etag_matches(request, etag):
+                return not_modified({"ETag": etag, "Cache-Control": "private, no-cache"})
+        rows, next_cursor = await get_notes_page_async(db, current_user, limit=limit, view=view, excerpt_chars=excerpt, **filters)
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions to access this note"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
+    # ETag yüklenen sayfanın kendisinden (ek sorgu yok)
+    version = page_version(rows, next_cursor is not None)
+    etag = make_etag(current_user.id, current_user.role.value, version, request.url.query)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    return note
+    # fast path: satırlar kendi DB'mizden geldiği için response_model validation'ı atlanır,
+    # precompiled TypeAdapter direkt JSON bytes üretir (response_model sadece OpenAPI için)
+    adapter = note_summary_rows_adapter if view == NoteView.SUMMARY else note_rows_adapter
+    response = RawJSONResponse(adapter.dump_json(rows), headers=headers)
+    
+    # sonraki sayfa için cursor header'da döner
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return response
 
 
-@router.delete("/{note_id}")
-async def delete_note(
-    note_id: str,
-    db: Session = Depends(get_db),
+@router.get("/search", response_model=Union[List[NoteResponse], List[NoteSummaryResponse]])
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: NoteView = NoteView.FULL,
+    excerpt: Optional[int] = Query(None, ge=1, le=settings.NOTE_EXCERPT_MAX_CHARS),
+    db: Session | AsyncSession = Depends(get_async_read_db),
     current_user:User = Depends(get_current_user)
 ):
-    note = db.query(Note).filter(Note.id == note_id).first()
-    
-    if not note:
+    # raw_text + summary full-text araması, en alakalı önce; scoping get_notes ile aynı
+    try:
+        rows, next_cursor = await search_notes_async(db, current_user, q, limit, cursor=cursor, view=view, excerpt_chars=excerpt)
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Note not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
     
-    if current_user.role != Role.ADMIN and note.user_id != current_user.id:
+    adapter = note_summary_rows_adapter if view == NoteView.SUMMARY else note_rows_adapter
+    response = RawJSONResponse(adapter.dump_json(rows))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+@router.get("/stats", response_model=NoteStatsResponse)
+async def get_note_stats(
+    db: Session | AsyncSession = Depends(get_async_read_db),
+    current_user:User = Depends(get_current_admin_user)
+):
+    # admin dashboard'u: status / kullanıcı bazında sayılar, backlog, ortalama özetleme süresi.
+    # Sayaçlardan okunur, notes tablosu taranmaz (bkz. crud/note_stats_crud.py)
+    return await get_note_stats_async(db)
+
+
+async def iter_note_events(request: Request, subscription) -> AsyncIterator[str]:
+    # SSE: her event bir "data:" satırı; boşta kalınca proxy'ler bağlantıyı kapatmasın diye heartbeat yorumu
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            event = await subscription.get(timeout=settings.NOTE_EVENTS_HEARTBEAT_SECONDS)
+            if event is None:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: note\ndata: {json.dumps(event)}\n\n"
+    finally:
+        note_event_hub.unsubscribe(subscription)
+
+
+@router.get("/events")
+async def stream_note_events(
+    request: Request,
+    current_user:User = Depends(get_current_user_for_stream)
+):
+    # worker'ın yayınladığı status değişiklikleri (Server-Sent Events).
+    # Admin tüm notların, diğerleri sadece kendi notlarının event'lerini alır (get_notes ile aynı).
+    if not note_event_hub.enabled:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions to delete this note"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note events are disabled"
         )
+    subscription = note_event_hub.subscribe(current_user)
+    return StreamingResponse(
+        iter_note_events(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def note_events_websocket(websocket: WebSocket, token: Optional[str] = None):
+    # WebSocket ile aynı event'ler; token ?token= ile verilir
+    if not note_event_hub.enabled:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Note events are disabled")
+        return
+    try:
+        current_user = await authenticate_stream_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscription = note_event_hub.subscribe(current_user)
+    # client'tan gelen mesajlar yok sayılır, receive sadece disconnect'i yakalamak için dinlenir
+    receive = asyncio.create_task(websocket.receive_text())
+    next_event = None
+    try:
+        while True:
+            if next_event is None:
+                next_event = asyncio.create_task(subscription.get(timeout=settings.NOTE_EVENTS_HEARTBEAT_SECONDS))
+            done, _ = await asyncio.wait({next_event, receive}, return_when=asyncio.FIRST_COMPLETED)
+            if receive in done:
+                if receive.exception() is not None:
+                    break
+                receive = asyncio.create_task(websocket.receive_text())
+            if next_event in done:
+                event = next_event.result()
+                next_event = None
+                if event is not None:
+                    await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receive.cancel()
+        if next_event is not None:
+            next_event.cancel()
+        note_event_hub.unsubscribe(subscription)
+
+
+@router.get("/{note_id}", response_model=Union[NoteResponse, NoteSummaryResponse])
+async def get_note(
+    note_id: str,
+    request: Request,
+    response: Response,
+    view: NoteView = NoteView.FULL,
+    excerpt: Optional[int] = Query(None, ge=1, le=settings.NOTE_EXCERPT_MAX_CHARS),
+    db: Session | AsyncSession = Depends(get_async_read_db),
+    current_user:User = Depends(get_current_user)
+):
+    ensure_note_id(note_id)
+    # If-None-Match varsa önce sadece (id, user_id, status, updated_at) okunur, değişmediyse body hiç yüklenmez
+    if request.headers.get("if-none-match"):
+        version = await with_primary_fallback(db, get_note_version_async, note_id, current_user)
+        if version is None:
+            raise await note_access_error(db, note_id)
+        etag = make_etag(version.id, version.updated_at, view.value, excerpt)
+        if etag_matches(request, etag):
+            return not_modified({"ETag": etag, "Cache-Control": note_cache_control(version.status)})
     
-    db.delete(note)
-    db.commit()
+    # agent'lar için sahiplik WHERE'de, başkasının notu yüklenmez
+    note = await with_primary_fallback(db, get_note_async, note_id, view, excerpt, current_user)
+    if note is None:
+        raise await note_access_error(db, note_id)
     
-    return {"message": "Note deleted successfully"}
\ No newline at end of file
+    response.headers["ETag"] = make_etag(note.id, note.updated_at, view.value, excerpt)
+    response.headers["Cache-Control"] = note_cache_control(note.status)
+    return render_view([note], view)[0]
+
+
+@router.delete("/{note_id}", dependencies=[Depends(mark_primary_write)])
+async def delete_note(
+    note_id: str,
+    db: Session | AsyncSession = Depends(get_async_db),
+    current_user:User = Depends(get_current_user)
+):
+    ensure_note_id(note_id)
+    # tek statement: DELETE ... WHERE id = ? AND (sahibi | admin) RETURNING, önce SELECT yok
+    if not await delete_note_async(db, note_id, current_user):
+        raise await note_access_error(db, note_id, "delete")
+    
+    return {"message": "Note deleted successfully"}
+
+
+@router.post("/bulk-delete", response_model=NoteBulkDeleteResponse, dependencies=[Depends(mark_primary_write)])
+async def delete_notes_bulk(
+    filters: NoteBulkDelete,
+    db: Session | AsyncSession = Depends(get_async_db),
+    current_user:User = Depends(get_current_user)
+):
+    # ids / status / created_before filtrelerinin hepsine uyan notlar silinir (agent sadece kendi notlarını).
+    # BULK_DELETE_BATCH_SIZE'lık batch'ler halinde, her batch ayrı transaction
+    if filters.ids is None and filters.status is None and filters.created_before is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one of ids, status or created_before is required"
+        )
+    deleted = await bulk_delete_notes_async(
+        db, current_user, ids=filters.ids, status=filters.status, created_before=filters.created_before
+    )
+    return {"deleted": deleted}
@@ -4,7 +4,7 @@ from app.core.settings import settings
 celery_app = Celery(
     "proksi_worker", # celery worker'ın çalıştığı uygulama adı
     broker=settings.CELERY_BROKER_URL, # celery worker'ın broker'ının adresi
-    backend=settings.CELERY_RESULT_BACKEND, # celery worker'ın backend'inin adresi
+    backend=settings.CELERY_RESULT_BACKEND or None, # result backend yok, task durumu Note.status'ta tutulur
 )
 
 # Configuration - celery worker'ın çalışması için gerekli olan ayarlar
@@ -14,10 +14,18 @@ celery_app.conf.update(
     result_serializer="json", # task'ın sonucunun gönderilmesi için kullanılacak serializer
     timezone="UTC", # timezone ayarları
     enable_utc=True, # UTC timezone'ını kullan
-    result_expires=3600, # task'ın sonucunun ne kadar süre sonra silineceği
-    task_track_started=True, # task'ın başladığını takip et
+    result_expires=3600, # task'ın sonucunun ne kadar süre sonra silineceği (result backend verilirse)
+    task_ignore_result=True, # AsyncResult hiç okunmaz, summary'ler Redis'te kopyalanmaz
+    task_track_started=False, # STARTED durumu da yazılmaz (IN_PROGRESS Note.status'ta)
     task_retry_jitter=True, # task'ın yeniden denenmesi için jitter ayarları
     task_retry_max_delay=600, # task'ın yeniden denenmesi için maksimum delay
     task_soft_time_limit=300, # task'ın soft time limit'i
     task_time_limit=600, # task'ın time limit'i
+    task_default_queue=settings.SUMMARY_DEFAULT_QUEUE, # fast lane task'ları outbox relay'den SUMMARY_FAST_QUEUE'ya gider
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER, # task'lar çağıran process'te çalışır (broker'a gitmez)
+    worker_pool=settings.WORKER_POOL, # threads: tek process'te çok sayıda task (I/O-bound summarization)
+    worker_concurrency=settings.WORKER_CONCURRENCY, # aynı anda çalışan task sayısı
+    worker_prefetch_multiplier=settings.WORKER_PREFETCH_MULTIPLIER, # concurrency başına önceden alınan mesaj
+    task_acks_late=settings.WORKER_ACKS_LATE, # mesaj task bitince ack'lenir
+    task_reject_on_worker_lost=settings.WORKER_ACKS_LATE, # worker ölürse mesaj kuyruğa geri döner
 ) 
\ No newline at end of file
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    # pool ve kuyruk dolu - istek hemen reddedilir (503)
+    pass
+
+
+@dataclass
+class HashingStats:
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    wait_seconds_total: float = 0.0
+    run_seconds_total: float = 0.0
+    run_seconds_max: float = 0.0
+
+
+stats = HashingStats()
+_stats_lock = threading.Lock()
+
+# çalışan + kuyrukta bekleyen iş sayısı bu sınırı aşamaz
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE)
+_executor: Optional[Executor] = None
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _timed_call(fn: Callable[..., Any], *args) -> tuple[Any, float]:
+    # executor içinde çalışır, process pool için modül seviyesinde olmalı
+    started = time.monotonic()
+    return fn(*args), started
+
+
+async def run_hashing(fn: Callable[..., Any], *args) -> Any:
+    # bcrypt hash/verify çağrısını bounded executor'da çalıştırır
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            stats.rejected += 1
+        logger.warning("Password hashing pool saturated, rejecting request")
+        raise PasswordHasherBusy()
+
+    submitted_at = time.monotonic()
+    with _stats_lock:
+        stats.submitted += 1
+        stats.in_flight += 1
+
+    def on_done(_future) -> None:
+        # iptal edilse bile slot geri verilir
+        _slots.release()
+        with _stats_lock:
+            stats.in_flight -= 1
+
+    future = get_executor().submit(_timed_call, fn, *args)
+    future.add_done_callback(on_done)
+    try:
+        result, started_at = await asyncio.wrap_future(future)
+    except Exception:
+        with _stats_lock:
+            stats.failed += 1
+        raise
+
+    finished_at = time.monotonic()
+    with _stats_lock:
+        stats.completed += 1
+        stats.wait_seconds_total += started_at - submitted_at
+        run_seconds = finished_at - started_at
+        stats.run_seconds_total += run_seconds
+        stats.run_seconds_max = max(stats.run_seconds_max, run_seconds)
+    return result
+
+
+def get_hashing_stats() -> dict:
+    with _stats_lock:
+        return asdict(stats)
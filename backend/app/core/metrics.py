@@ -0,0 +1,289 @@
+import contextvars
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrikleri. Counter/Histogram observe'ları process içi (düşük maliyet);
+# pool, cache, kuyruk gibi anlık değerler scrape sırasında collector'larla okunur.
+# Birden fazla process (gunicorn workers, celery prefork) için PROMETHEUS_MULTIPROC_DIR verilmelidir.
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "DB queries executed per HTTP request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Total DB query time per HTTP request", ["route"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "DB query (cursor execute) latency", ["pool"],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the pool (wait + connect)", ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+CELERY_PUBLISH_DURATION = Histogram(
+    "celery_publish_duration_seconds", "Broker publish latency per message", ["task"],
+)
+WORKER_TASK_DURATION = Histogram(
+    "worker_task_duration_seconds", "Celery task run time", ["task", "state"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 7.5, 10, 15, 30, 60, 120, 300),
+)
+WORKER_TASK_QUEUE_WAIT = Histogram(
+    "worker_task_queue_wait_seconds", "Time from broker publish to task start", ["task", "queue"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+# not oluşturulduktan worker'ın almasına kadar (outbox + broker kuyruğu), lane başına p50/p95/p99 için
+SUMMARY_QUEUE_WAIT = Histogram(
+    "summary_queue_wait_seconds", "Time from note creation to summarization start", ["lane"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+WORKER_TASK_RETRIES = Counter("worker_task_retries", "Celery task retries", ["task"])
+WORKER_NOTES = Counter("worker_notes_processed", "Notes processed by the worker (rate() = notes/sec)", ["status"])
+
+
+# --- request başına DB sorgu sayısı / süresi ---
+
+class RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# threadpool (sync Session) ve greenlet (AsyncSession) aynı context'i taşır, mutable obje paylaşılır
+_request_db_stats: contextvars.ContextVar[Optional[RequestDBStats]] = contextvars.ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine, pool_name: str) -> None:
+    # engine event'leri: her cursor execute süresi ölçülür, aktif request varsa ona da eklenir
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info.pop("query_started_at", None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        DB_QUERY_DURATION.labels(pool_name).observe(elapsed)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+
+def _timed_pool(base: type, pool_name: str) -> type:
+    # QueuePool._do_get: boş bağlantı yoksa bekleme (ve gerekirse yeni bağlantı) burada olur
+    class TimedPool(base):
+        def _do_get(self):
+            started_at = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                DB_POOL_CHECKOUT_SECONDS.labels(pool_name).observe(time.perf_counter() - started_at)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+TimedQueuePool = _timed_pool(QueuePool, "sync")
+TimedAsyncAdaptedQueuePool = _timed_pool(AsyncAdaptedQueuePool, "async")
+TimedReplicaQueuePool = _timed_pool(QueuePool, "replica-sync")
+TimedReplicaAsyncAdaptedQueuePool = _timed_pool(AsyncAdaptedQueuePool, "replica-async")
+
+
+# --- HTTP middleware ---
+
+class MetricsMiddleware:
+    # pure ASGI middleware (BaseHTTPMiddleware'in task/stream maliyeti yok).
+    # route label'ı path template'idir (/api/notes/{note_id}), id'ler label'a girmez.
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[Callable, str] = {}
+
+    def route_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        label = self._routes.get(endpoint)
+        if label is None:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    label = route.path
+                    break
+            label = label or "unmatched"
+            self._routes[endpoint] = label
+        return label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            _request_db_stats.reset(token)
+            route = self.route_label(scope)
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(elapsed)
+            HTTP_REQUEST_DB_QUERIES.labels(route).observe(stats.queries)
+            HTTP_REQUEST_DB_SECONDS.labels(route).observe(stats.seconds)
+
+
+# --- scrape anında okunan değerler ---
+# describe() boş döner: registry register sırasında collect() çağırmaz (Redis/DB'ye gidilmez)
+
+class StatsCollector(Collector):
+    # get_stats() -> dict veren kaynaklar (hashing, principal/summary cache, note events, outbox relay ...).
+    # counters: monoton artan alanlar, diğerleri gauge olarak yazılır.
+    def __init__(self, prefix: str, get_stats: Callable[[], dict], counters: Iterable[str] = ()):
+        self.prefix = prefix
+        self.get_stats = get_stats
+        self.counters = set(counters)
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        try:
+            stats = self.get_stats()
+        except Exception as e:
+            logger.warning(f"{self.prefix} stats unavailable: {e}")
+            return
+        for name, value in stats.items():
+            if value is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric_name = f"{self.prefix}_{name}"
+            if name in self.counters:
+                yield CounterMetricFamily(metric_name, f"{self.prefix} {name}", value=value)
+            else:
+                yield GaugeMetricFamily(metric_name, f"{self.prefix} {name}", value=value)
+
+
+class PoolCollector(Collector):
+    def __init__(self, pools: Dict[str, object]):
+        self.pools = pools
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        in_use = GaugeMetricFamily("db_pool_connections_in_use", "Checked out connections", labels=["pool"])
+        idle = GaugeMetricFamily("db_pool_connections_idle", "Idle connections in the pool", labels=["pool"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections above pool_size", labels=["pool"])
+        for name, pool in self.pools.items():
+            if not isinstance(pool, QueuePool):
+                continue
+            in_use.add_metric([name], pool.checkedout())
+            idle.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield in_use
+        yield idle
+        yield overflow
+
+
+class QueueDepthCollector(Collector):
+    # Celery Redis broker'ında kuyruk = list, LLEN ile okunur (scrape başına tek round trip)
+    def __init__(self, redis_url: str, queues: Callable[[], List[str]]):
+        import redis
+
+        self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.queues = queues
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        import redis
+
+        depth = GaugeMetricFamily("celery_queue_depth", "Messages waiting in the broker queue", labels=["queue"])
+        queues = self.queues()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for queue in queues:
+                pipe.llen(queue)
+            for queue, length in zip(queues, pipe.execute()):
+                depth.add_metric([queue], length)
+        except redis.RedisError as e:
+            logger.warning(f"Queue depth unavailable: {e}")
+            return
+        yield depth
+
+
+# --- export ---
+
+def _multiprocess_registry() -> Optional[CollectorRegistry]:
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return None
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+_collectors: List[Collector] = []
+
+
+def register_collector(collector: Collector) -> None:
+    # multiprocess modda process'e özel collector'lar scrape registry'sine ayrıca eklenir
+    _collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    # multiprocess modda registry her scrape'te dosyalardan yeniden toplanır
+    registry = _multiprocess_registry()
+    if registry is None:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    for collector in _collectors:
+        registry.register(collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    # API dışındaki process'ler (worker, outbox relay) için ayrı HTTP server
+    if not settings.METRICS_ENABLED or not port:
+        return
+    registry = _multiprocess_registry()
+    if registry is not None:
+        for collector in _collectors:
+            registry.register(collector)
+    start_http_server(port, registry=registry or REGISTRY)
+    logger.info(f"Metrics server listening on :{port}")
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Set
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.settings import settings
+from app.schemas.users import Role
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_INTERVAL_SECONDS = 1
+
+
+# --- worker tarafı: status değişiklikleri Redis pub/sub'a yazılır ---
+
+_publisher: Optional[redis.Redis] = None
+
+
+def _get_publisher() -> redis.Redis:
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(settings.NOTE_EVENTS_REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _publisher
+
+
+def note_event(note_id: str, user_id: str, status, updated_at=None) -> dict:
+    return {
+        "id": note_id,
+        "user_id": user_id,
+        "status": getattr(status, "value", status),
+        "updated_at": updated_at.isoformat() if updated_at is not None else None,
+    }
+
+
+def publish_note_events(events: List[dict]) -> None:
+    # tek pipeline ile yayınlanır; hata summarization'ı durdurmaz, client'lar GET ile tekrar okuyabilir
+    if not settings.NOTE_EVENTS_ENABLED or not events:
+        return
+    try:
+        pipe = _get_publisher().pipeline(transaction=False)
+        for event in events:
+            pipe.publish(settings.NOTE_EVENTS_CHANNEL, json.dumps(event))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Note event publish failed: {e}")
+
+
+# --- API tarafı: process başına tek subscriber, client'lara bellekte dağıtılır ---
+
+@dataclass
+class NoteEventStats:
+    subscribers: int = 0
+    received: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    reconnects: int = 0
+
+
+class Subscription:
+    # bir SSE/WebSocket client'ı; kuyruk dolarsa (yavaş client) event'ler düşürülür
+    def __init__(self, user_id: str, is_admin: bool, queue_size: int):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=queue_size)
+
+    def visible(self, event: dict) -> bool:
+        # get_notes ile aynı kural: admin hepsini, diğerleri sadece kendi notlarını görür
+        return self.is_admin or event.get("user_id") == self.user_id
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class NoteEventHub:
+    def __init__(self, redis_url: str, channel: str, queue_size: int, enabled: bool = True):
+        self.redis_url = redis_url
+        self.channel = channel
+        self.queue_size = queue_size
+        self.enabled = enabled
+        self.stats = NoteEventStats()
+        self._subscriptions: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, principal) -> Subscription:
+        subscription = Subscription(principal.id, principal.role == Role.ADMIN, self.queue_size)
+        self._subscriptions.add(subscription)
+        self.stats.subscribers = len(self._subscriptions)
+        # subscriber bağlantısı ilk client ile açılır (NOTE_EVENTS_ENABLED=false ise hiç açılmaz)
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        self.stats.subscribers = len(self._subscriptions)
+        # son client gidince Redis subscription'ı kapatılır, bir sonraki subscribe yeniden açar
+        if not self._subscriptions and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def dispatch(self, event: dict) -> None:
+        self.stats.received += 1
+        for subscription in self._subscriptions:
+            if not subscription.visible(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                self.stats.delivered += 1
+            except asyncio.QueueFull:
+                self.stats.dropped += 1
+
+    async def _listen(self) -> None:
+        # bağlantı koparsa yeniden bağlanılır; kopukken kaçan event'ler için client GET ile senkronize olur
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    try:
+                        self.dispatch(json.loads(message["data"]))
+                    except (ValueError, TypeError):
+                        logger.warning("Invalid note event ignored")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Note event subscriber disconnected: {e}")
+                self.stats.reconnects += 1
+                await asyncio.sleep(RECONNECT_INTERVAL_SECONDS)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return asdict(self.stats)
+
+
+note_event_hub = NoteEventHub(
+    redis_url=settings.NOTE_EVENTS_REDIS_URL,
+    channel=settings.NOTE_EVENTS_CHANNEL,
+    queue_size=settings.NOTE_EVENTS_QUEUE_SIZE,
+    enabled=settings.NOTE_EVENTS_ENABLED,
+)
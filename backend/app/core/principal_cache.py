@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.settings import settings
+from app.models.users import Role
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_INTERVAL_SECONDS = 1
+
+
+@dataclass(frozen=True)
+class Principal:
+    # get_current_user'ın döndürdüğü hafif kullanıcı bilgisi (ORM objesi değil)
+    id: str
+    email: str
+    role: Role
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role)
+
+
+class PrincipalCache:
+    # doğrulanmış token -> Principal, LRU + TTL; entry token'ın exp'inden sonra yaşamaz
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= now:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def set(self, token: str, principal: Principal, token_exp: Optional[float] = None) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, principal)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> int:
+        # role değişikliği veya silme sonrası kullanıcının bu process'teki tüm token'ları düşürülür
+        with self._lock:
+            tokens = list(self._tokens_by_user.get(user_id, ()))
+            for token in tokens:
+                self._remove(token)
+            self.invalidations += len(tokens)
+            return len(tokens)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        _, principal = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations, "entries": len(self._entries)}
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# --- diğer process'ler: invalidation Redis pub/sub ile yayılır ---
+
+_publisher: Optional[redis.Redis] = None
+
+
+def _get_publisher() -> redis.Redis:
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(settings.PRINCIPAL_INVALIDATION_REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _publisher
+
+
+def invalidate_principal(user_id: str) -> None:
+    # role'ü değişen / silinen kullanıcı: bu process'te hemen, diğerlerinde listener ile düşürülür.
+    # Yayın başarısız olursa diğer process'lerde eski principal en geç PRINCIPAL_CACHE_TTL_SECONDS yaşar
+    principal_cache.invalidate_user(user_id)
+    try:
+        _get_publisher().publish(settings.PRINCIPAL_INVALIDATION_CHANNEL, user_id)
+    except redis.RedisError as e:
+        logger.warning(f"Principal invalidation publish failed: {e}")
+
+
+class PrincipalInvalidationListener:
+    # API process'i başına tek subscriber (lifespan'de başlar)
+    def __init__(self, cache: PrincipalCache, redis_url: str, channel: str):
+        self.cache = cache
+        self.redis_url = redis_url
+        self.channel = channel
+        self.received = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # bağlantı kopukken kaçan invalidation'lar bilinmez: cache baştan doldurulur
+                self.cache.clear()
+                async for message in pubsub.listen():
+                    self.received += 1
+                    self.cache.invalidate_user(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis yokken her saniye log basılmasın, sadece ilk kopuşta uyarılır
+                if self.reconnects == 0:
+                    logger.warning(f"Principal invalidation subscriber disconnected: {e}")
+                self.reconnects += 1
+                await asyncio.sleep(RECONNECT_INTERVAL_SECONDS)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+principal_invalidation_listener = PrincipalInvalidationListener(
+    principal_cache,
+    redis_url=settings.PRINCIPAL_INVALIDATION_REDIS_URL,
+    channel=settings.PRINCIPAL_INVALIDATION_CHANNEL,
+)
@@ -0,0 +1,126 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+
+TOKEN_RE = re.compile(r"\w+")
+REFRESH_BATCH_SIZE = 5000
+# başka process'lerin geç commit ettiği yazmalar kaçmasın diye watermark'tan bu kadar geri okunur
+REFRESH_OVERLAP = timedelta(seconds=5)
+# arka arkaya aramalar DB'yi her seferinde taramasın; index en fazla bu kadar geride kalır
+REFRESH_INTERVAL_SECONDS = 1.0
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def search_document(raw_text: Optional[str], summary: Optional[str]) -> str:
+    # index'e giren metin: raw_text'in ilk SEARCH_MAX_DOCUMENT_CHARS'ı + summary (Postgres'te de aynı)
+    return f"{(raw_text or '')[:settings.SEARCH_MAX_DOCUMENT_CHARS]} {summary or ''}"
+
+
+class InvertedIndex:
+    # Postgres olmayan kurulumlar (SQLite test / benchmark) için process içi full-text index:
+    # token -> {note_id: tf}. DB'den updated_at watermark'ı ile artımlı doldurulur, böylece worker'ın
+    # başka process'te yazdığı summary'ler de bir sonraki aramada index'e girer. Silinen notlar
+    # index'te kalabilir; sonuçlar DB'den scoping sorgusuyla süzüldüğü için dönmezler.
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # note_id -> (index'lendiği updated_at, terimler)
+        self._note_terms: Dict[str, Tuple[datetime, Tuple[str, ...]]] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _remove(self, note_id: str) -> None:
+        _, terms = self._note_terms.pop(note_id, (None, ()))
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(note_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _add(self, note_id: str, updated_at: datetime, text: str) -> None:
+        self._remove(note_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[note_id] = tf
+        self._note_terms[note_id] = (updated_at, tuple(counts))
+
+    def refresh(self, db: Session) -> int:
+        # son refresh'ten sonra değişen notlar (yeniden) index'lenir. Overlap penceresindeki notlar
+        # önce dar (id, updated_at) satırlarıyla kontrol edilir, sadece değişenlerin text'i okunur.
+        from app.crud.note_bodies_crud import load_note_bodies
+        from app.models.notes import Note
+
+        with self._lock:
+            if time.monotonic() - self._refreshed_at < REFRESH_INTERVAL_SECONDS:
+                return 0
+            changed = select(Note.id, Note.updated_at)
+            if self._watermark is not None:
+                changed = changed.where(Note.updated_at >= self._watermark - REFRESH_OVERLAP)
+            stale = {}
+            for note_id, updated_at in db.execute(changed):
+                indexed = self._note_terms.get(note_id)
+                if indexed is None or indexed[0] != updated_at:
+                    stale[note_id] = updated_at
+                if self._watermark is None or updated_at > self._watermark:
+                    self._watermark = updated_at
+
+            note_ids = list(stale)
+            for i in range(0, len(note_ids), REFRESH_BATCH_SIZE):
+                rows = db.execute(
+                    select(Note.id, Note.raw_text, Note.summary).where(Note.id.in_(note_ids[i:i + REFRESH_BATCH_SIZE]))
+                ).all()
+                # sıkıştırılmış notlarda raw_text "" - text note_bodies'den açılır
+                bodies = load_note_bodies(db, [row.id for row in rows if row.raw_text == ""])
+                for row in rows:
+                    self._add(row.id, stale[row.id], search_document(bodies.get(row.id, row.raw_text), row.summary))
+            self._refreshed_at = time.monotonic()
+            return len(stale)
+
+    def search(self, query: str) -> List[str]:
+        # tüm terimleri içeren notlar, tf * idf toplamına göre sıralı
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if any(p is None for p in postings):
+                return []
+            postings.sort(key=len)
+            total = len(self._note_terms)
+            scores: Dict[str, float] = {}
+            for note_id, tf in postings[0].items():
+                score = tf * math.log(1 + total / len(postings[0]))
+                for other in postings[1:]:
+                    other_tf = other.get(note_id)
+                    if other_tf is None:
+                        break
+                    score += other_tf * math.log(1 + total / len(other))
+                else:
+                    scores[note_id] = score
+        return sorted(scores, key=lambda note_id: (-scores[note_id], note_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._note_terms.clear()
+            self._watermark = None
+            self._refreshed_at = float("-inf")
+
+    def get_stats(self) -> dict:
+        return {"notes": len(self._note_terms), "terms": len(self._postings)}
+
+
+search_index = InvertedIndex()
@@ -3,12 +3,15 @@ import secrets
 from datetime import datetime, timedelta
 from typing import Any, Union, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core.principal_cache import Principal, principal_cache
+from app.db.replicas import get_async_read_db, with_primary_retry
+from app.db.session import async_session_scope
 from app.schemas.users import Role, User
 
 # Security Configuration
@@ -18,6 +21,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES',
 
 # JWT Bearer Token
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def create_access_token(subject: str | Any, expires_delta: Optional[timedelta] = None) -> str:
@@ -42,12 +46,9 @@ def verify_token(token: str) -> Optional[str]: # token'ın doğruluğunu kontrol
         return None
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    # get_user_by_email'i burada import etmek için gerekli
-    from app.crud.users_crud import get_user_by_email
+async def authenticate_token(token: str, db: Session | AsyncSession):
+    # get_user_by_email_async'i burada import etmek için gerekli
+    from app.crud.users_crud import get_user_by_email_async
     
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,19 +56,58 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    # daha önce doğrulanmış token ise JWT decode ve DB sorgusu atlanır
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_email(db, email=email)
+    # imzası doğrulanmış token: replica'da yoksa (yeni signup, cookie tutmayan client) primary'ye bakılır,
+    # principal cache tekrar eden sorguları zaten karşılar
+    user = await with_primary_retry(db, get_user_by_email_async, email=email)
     if user is None:
         raise credentials_exception
     
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.set(token, principal, token_exp=payload.get("exp"))
+    return principal
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session | AsyncSession = Depends(get_async_read_db)
+):
+    # kullanıcı sorgusu (principal cache miss) replica'dan
+    return await authenticate_token(credentials.credentials, db)
+
+
+async def authenticate_stream_token(token: Optional[str]):
+    # uzun süren SSE/WebSocket bağlantıları DB session'ı tutmaz, session sadece doğrulama için açılır
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    async with async_session_scope() as db:
+        return await authenticate_token(token, db)
+
+
+async def get_current_user_for_stream(
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    # EventSource header gönderemez, token ?token= ile de verilebilir
+    if credentials is not None:
+        token = credentials.credentials
+    return await authenticate_stream_token(token)
 
 
 def get_current_admin_user(current_user:User = Depends(get_current_user)):
@@ -1,4 +1,6 @@
 import os
+from typing import List
+
 from pydantic_settings import BaseSettings
 from pydantic_core import MultiHostUrl
 from pydantic import (
@@ -6,6 +8,14 @@ from pydantic import (
     computed_field
 )
 
+
+def async_database_uri(uri: str) -> str:
+    # psycopg aynı URL ile async çalışır, sqlite için aiosqlite driver'ı gerekir
+    if uri.startswith("sqlite://"):
+        return uri.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return uri
+
+
 class Settings(BaseSettings):
     # DB settings
     POSTGRES_USER: str = os.getenv('POSTGRES_USER', 'user')
@@ -13,10 +23,14 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv('POSTGRES_DB', 'proksi_db')
     POSTGRES_PORT: int = int(os.getenv('POSTGRES_PORT', 5433)) 
     POSTGRES_HOST: str = os.getenv('POSTGRES_HOST', 'localhost')
+    # verilirse POSTGRES_* yerine kullanılır (ör. local benchmark: sqlite:////tmp/bench.db)
+    DATABASE_URL: str = os.getenv('DATABASE_URL', '')
 
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str: # database'in adresi
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return str(MultiHostUrl.build(
             scheme="postgresql+psycopg",
             username=self.POSTGRES_USER,
@@ -26,27 +40,197 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         ))
     
+    @computed_field
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return async_database_uri(self.SQLALCHEMY_DATABASE_URI)
+    
+    # Read replica'lar - virgülle ayrılmış DSN'ler; boşsa tüm okumalar primary'de.
+    # Okuma endpoint'leri (note listesi/detayı, token'daki kullanıcı) replica'ya gider, yazmalar primary'de kalır.
+    DATABASE_REPLICA_URLS: str = os.getenv('DATABASE_REPLICA_URLS', '')
+    # lag'i bunu aşan replica'ya okuma gönderilmez (hepsi aşarsa primary)
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', 5))
+    DB_REPLICA_LAG_CHECK_SECONDS: float = float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', 1))
+    # read-your-writes: yazan client'ın okumaları bu süre boyunca primary'den
+    DB_READ_YOUR_WRITES_SECONDS: float = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))
+    
+    @computed_field
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(',') if url.strip()]
+    
+    @computed_field
+    @property
+    def SQLALCHEMY_ASYNC_REPLICA_URIS(self) -> List[str]:
+        return [async_database_uri(uri) for uri in self.SQLALCHEMY_REPLICA_URIS]
+    
+    # Async DB path (psycopg async driver). False ise sync Session threadpool'da çalışır
+    DB_ASYNC: bool = os.getenv('DB_ASYNC', 'true').lower() in ('1', 'true', 'yes')
+    DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    
+    # Password hashing executor (bcrypt event loop dışında çalışır)
+    PASSWORD_HASH_EXECUTOR: str = os.getenv('PASSWORD_HASH_EXECUTOR', 'thread')  # thread | process
+    PASSWORD_HASH_WORKERS: int = int(os.getenv('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 32))
+    
+    # Authenticated principal cache (token -> user), token exp'i ile sınırlı
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', 60))
+    # role değişikliği / kullanıcı silme diğer API process'lerinin cache'ine Redis pub/sub ile yayılır
+    PRINCIPAL_INVALIDATION_CHANNEL: str = os.getenv('PRINCIPAL_INVALIDATION_CHANNEL', 'principal-invalidations')
+    
     # Redis/Celery settings
     REDIS_HOST: str = os.getenv('REDIS_HOST', 'localhost')
     REDIS_PORT: int = int(os.getenv('REDIS_PORT', 6379))
     REDIS_DB: int = int(os.getenv('REDIS_DB', 0))
+    # verilirse REDIS_* yerine kullanılır (ör. memory://)
+    BROKER_URL: str = os.getenv('BROKER_URL', '')
+    # eager mode: task'lar broker'a gitmeden çağıran process'te çalışır (local geliştirme / benchmark)
+    CELERY_TASK_ALWAYS_EAGER: bool = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'false').lower() in ('1', 'true', 'yes')
     
     @computed_field
     @property
     def CELERY_BROKER_URL(self) -> str:
+        if self.BROKER_URL:
+            return self.BROKER_URL
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+    # task sonuçları saklanmaz (durum Note.status'ta); sadece debug için verilir (ör. redis://localhost:6379/0)
+    CELERY_RESULT_BACKEND: str = os.getenv('CELERY_RESULT_BACKEND', '')
+    
+    # Note status event'leri (SSE / WebSocket) - worker Redis pub/sub'a yazar, API process başına tek subscriber
+    NOTE_EVENTS_ENABLED: bool = os.getenv('NOTE_EVENTS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    NOTE_EVENTS_CHANNEL: str = os.getenv('NOTE_EVENTS_CHANNEL', 'note-events')
+    NOTE_EVENTS_QUEUE_SIZE: int = int(os.getenv('NOTE_EVENTS_QUEUE_SIZE', 100))  # client başına, dolarsa event düşer
+    NOTE_EVENTS_HEARTBEAT_SECONDS: int = int(os.getenv('NOTE_EVENTS_HEARTBEAT_SECONDS', 15))
+    
+    @computed_field
+    @property
+    def NOTE_EVENTS_REDIS_URL(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
     
     @computed_field
     @property
-    def CELERY_RESULT_BACKEND(self) -> str:
+    def PRINCIPAL_INVALIDATION_REDIS_URL(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
     
+    # Worker execution - threads: process başına WORKER_CONCURRENCY summarization aynı anda (AI çağrısı I/O-bound),
+    # prefork: child process başına bir task, solo: tek task (eski --concurrency=1 davranışı)
+    WORKER_POOL: str = os.getenv('WORKER_POOL', 'threads')  # threads | prefork | solo | gevent
+    WORKER_CONCURRENCY: int = int(os.getenv('WORKER_CONCURRENCY', 16))  # DB_POOL_SIZE + DB_MAX_OVERFLOW'u aşmamalı
+    WORKER_PREFETCH_MULTIPLIER: int = int(os.getenv('WORKER_PREFETCH_MULTIPLIER', 1))
+    # ack task bittikten sonra: worker ölürse mesaj başka worker'a gider. Batch task'ında redeliver edilen mesaj
+    # sadece hâlâ QUEUED olan notları alır; ölen worker'ın claim ettiği notlar maintenance'ın claim
+    # timeout'u ile (SUMMARY_CLAIM_TIMEOUT_SECONDS) kuyruğa geri döner
+    WORKER_ACKS_LATE: bool = os.getenv('WORKER_ACKS_LATE', 'true').lower() in ('1', 'true', 'yes')
+    # CPU-bound summarization (tfidf) - process: ayrı process pool'da çalışır, thread'ler GIL için yarışmaz
+    SUMMARY_CPU_EXECUTOR: str = os.getenv('SUMMARY_CPU_EXECUTOR', 'inline')  # inline | process
+    SUMMARY_CPU_WORKERS: int = int(os.getenv('SUMMARY_CPU_WORKERS', os.cpu_count() or 1))
+    
+    # Summarization lane'leri - kısa notlar ayrı kuyrukta (fast lane), bulk import'ların arkasında beklemez.
+    # Relay her lane'de broker'a en fazla SUMMARY_LANE_MAX_QUEUE_DEPTH task bırakır, gerisi outbox'ta
+    # kullanıcı bazında round robin ile sırasını bekler.
+    SUMMARY_FAST_LANE_MAX_CHARS: int = int(os.getenv('SUMMARY_FAST_LANE_MAX_CHARS', 2000))
+    SUMMARY_FAST_QUEUE: str = os.getenv('SUMMARY_FAST_QUEUE', 'summaries-fast')
+    SUMMARY_DEFAULT_QUEUE: str = os.getenv('SUMMARY_DEFAULT_QUEUE', 'celery')
+    SUMMARY_LANE_MAX_QUEUE_DEPTH: int = int(os.getenv('SUMMARY_LANE_MAX_QUEUE_DEPTH', 32))
+    # worker'ın dinlediği kuyruklar; fast lane için ayrı worker: WORKER_QUEUES=summaries-fast
+    WORKER_QUEUES: str = os.getenv('WORKER_QUEUES', 'summaries-fast,celery')
+    
+    # Summarization batching - bir worker.summarize_notes_batch task'ındaki en fazla not
+    SUMMARY_BATCH_SIZE: int = int(os.getenv('SUMMARY_BATCH_SIZE', 50))
+    # AI özetleme gecikmesi (stub), batch başına bir kez beklenir
+    SUMMARY_SIMULATED_LATENCY_SECONDS: float = float(os.getenv('SUMMARY_SIMULATED_LATENCY_SECONDS', 5))
+    
+    # Summarizer - rule: eski rule-based (fallback), tfidf: vectorized batch engine
+    SUMMARIZER_ENGINE: str = os.getenv('SUMMARIZER_ENGINE', 'rule')
+    SUMMARY_TOP_K: int = int(os.getenv('SUMMARY_TOP_K', 3))
+    
+    # Büyük notlar: eşiğin üstündeki notlar DB'den chunk chunk okunup stream edilerek özetlenir,
+    # SUMMARY_MAX_INPUT_CHARS'tan büyük notlar kabul edilmez / FAILED olur
+    SUMMARY_MAX_INPUT_CHARS: int = int(os.getenv('SUMMARY_MAX_INPUT_CHARS', 50 * 1024 * 1024))
+    SUMMARY_STREAM_THRESHOLD_CHARS: int = int(os.getenv('SUMMARY_STREAM_THRESHOLD_CHARS', 256 * 1024))
+    SUMMARY_STREAM_CHUNK_CHARS: int = int(os.getenv('SUMMARY_STREAM_CHUNK_CHARS', 1024 * 1024))
+    SUMMARY_STREAM_HEAD_SENTENCES: int = int(os.getenv('SUMMARY_STREAM_HEAD_SENTENCES', 20))
+    SUMMARY_STREAM_TAIL_SENTENCES: int = int(os.getenv('SUMMARY_STREAM_TAIL_SENTENCES', 5))
+    SUMMARY_STREAM_MAX_SENTENCE_CHARS: int = int(os.getenv('SUMMARY_STREAM_MAX_SENTENCE_CHARS', 2000))
+    
+    # Summary cache - raw_text hash'i + summarizer engine/versiyonu ile anahtarlanır
+    SUMMARIZER_VERSION: str = os.getenv('SUMMARIZER_VERSION', 'v1')
+    SUMMARY_CACHE_ENABLED: bool = os.getenv('SUMMARY_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    SUMMARY_CACHE_LOCAL_SIZE: int = int(os.getenv('SUMMARY_CACHE_LOCAL_SIZE', 10000))
+    SUMMARY_CACHE_TTL_SECONDS: int = int(os.getenv('SUMMARY_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    SUMMARY_CACHE_REDIS_TIMEOUT_MS: int = int(os.getenv('SUMMARY_CACHE_REDIS_TIMEOUT_MS', 50))
+    SUMMARY_CACHE_REDIS_HOST: str = os.getenv('SUMMARY_CACHE_REDIS_HOST', os.getenv('REDIS_HOST', 'localhost'))
+    SUMMARY_CACHE_REDIS_PORT: int = int(os.getenv('SUMMARY_CACHE_REDIS_PORT', os.getenv('REDIS_PORT', 6379)))
+    SUMMARY_CACHE_REDIS_DB: int = int(os.getenv('SUMMARY_CACHE_REDIS_DB', 1))
+    
+    @computed_field
+    @property
+    def SUMMARY_CACHE_REDIS_URL(self) -> str:
+        return f"redis://{self.SUMMARY_CACHE_REDIS_HOST}:{self.SUMMARY_CACHE_REDIS_PORT}/{self.SUMMARY_CACHE_REDIS_DB}"
+    
+    # Outbox relay - outbox tablosunu batch'ler halinde broker'a taşır
+    OUTBOX_BATCH_SIZE: int = int(os.getenv('OUTBOX_BATCH_SIZE', 500))
+    OUTBOX_POLL_INTERVAL_MS: int = int(os.getenv('OUTBOX_POLL_INTERVAL_MS', 200))
+    # round robin sırası lane başına en eski bu kadar event üzerinde hesaplanır (her poll'da tüm outbox sıralanmaz)
+    OUTBOX_FAIRNESS_WINDOW: int = int(os.getenv('OUTBOX_FAIRNESS_WINDOW', 10000))
+    
+    # Note stats (GET /api/notes/stats) - maintenance process'i (worker/maintenance.py) delta'ları bu aralıkla
+    # note_stats'a toplar ve sayaçları bu aralıkla notes'tan yeniden sayar (drift düzeltmesi)
+    NOTE_STATS_ROLLUP_SECONDS: float = float(os.getenv('NOTE_STATS_ROLLUP_SECONDS', 10))
+    NOTE_STATS_RECONCILE_SECONDS: float = float(os.getenv('NOTE_STATS_RECONCILE_SECONDS', 3600))
+    
+    # Bulk ingestion (POST /api/notes/bulk) - her chunk ayrı transaction
+    BULK_INSERT_CHUNK_SIZE: int = int(os.getenv('BULK_INSERT_CHUNK_SIZE', 1000))
+    # Bulk delete (POST /api/notes/bulk-delete) - her batch ayrı DELETE ... RETURNING transaction'ı
+    BULK_DELETE_BATCH_SIZE: int = int(os.getenv('BULK_DELETE_BATCH_SIZE', 1000))
+    BULK_DELETE_MAX_IDS: int = int(os.getenv('BULK_DELETE_MAX_IDS', 1000))
+    
+    # Retention (worker/maintenance.py) - NOTE_RETENTION_DAYS'ten eski COMPLETED / FAILED notlar silinir (0: kapalı).
+    # Küçük batch'ler + aralarında bekleme: lock'lar kısa kalır, autovacuum / replica'lar yetişir;
+    # tur başına en fazla NOTE_RETENTION_MAX_ROWS_PER_RUN not (bloat bir seferde patlamaz)
+    NOTE_RETENTION_DAYS: int = int(os.getenv('NOTE_RETENTION_DAYS', 0))
+    NOTE_RETENTION_INTERVAL_SECONDS: float = float(os.getenv('NOTE_RETENTION_INTERVAL_SECONDS', 600))
+    NOTE_RETENTION_BATCH_SIZE: int = int(os.getenv('NOTE_RETENTION_BATCH_SIZE', 1000))
+    NOTE_RETENTION_BATCH_PAUSE_MS: int = int(os.getenv('NOTE_RETENTION_BATCH_PAUSE_MS', 200))
+    NOTE_RETENTION_MAX_ROWS_PER_RUN: int = int(os.getenv('NOTE_RETENTION_MAX_ROWS_PER_RUN', 100000))
+    
+    # Claim lease (worker/maintenance.py) - worker crash / OOM / hard time limit sonrası IN_PROGRESS kalan notlar
+    # claim'den (updated_at) bu kadar sonra tekrar QUEUED yapılır. task_time_limit'ten (600s) büyük olmalı,
+    # yoksa hâlâ çalışan bir task'ın notu ikinci kez özetlenir
+    SUMMARY_CLAIM_TIMEOUT_SECONDS: float = float(os.getenv('SUMMARY_CLAIM_TIMEOUT_SECONDS', 900))
+    SUMMARY_REQUEUE_INTERVAL_SECONDS: float = float(os.getenv('SUMMARY_REQUEUE_INTERVAL_SECONDS', 60))
+    SUMMARY_REQUEUE_BATCH_SIZE: int = int(os.getenv('SUMMARY_REQUEUE_BATCH_SIZE', 1000))
+    
+    # Note body storage - inline: notes.raw_text, zstd: note_bodies tablosunda sıkıştırılmış
+    # (liste taramaları notes tablosunda sadece dar satırlara dokunur)
+    NOTE_BODY_STORAGE: str = os.getenv('NOTE_BODY_STORAGE', 'inline')  # inline | zstd
+    NOTE_BODY_ZSTD_LEVEL: int = int(os.getenv('NOTE_BODY_ZSTD_LEVEL', 3))
+    NOTE_EXCERPT_MAX_CHARS: int = int(os.getenv('NOTE_EXCERPT_MAX_CHARS', 2000))
+    
+    # Full-text search (GET /api/notes/search) - Postgres tsvector + GIN, diğer DB'lerde in-process inverted index
+    SEARCH_TEXT_CONFIG: str = os.getenv('SEARCH_TEXT_CONFIG', 'english')  # Postgres text search config
+    # index'e raw_text'in en fazla bu kadarı girer (tsvector sınırı 1MB); stream edilen büyük notlarda sadece summary
+    SEARCH_MAX_DOCUMENT_CHARS: int = int(os.getenv('SEARCH_MAX_DOCUMENT_CHARS', 100_000))
+    
+    # Conditional GET - COMPLETED notlar bir daha değişmez, client bu süre boyunca tekrar sormaz
+    NOTE_CACHE_MAX_AGE_SECONDS: int = int(os.getenv('NOTE_CACHE_MAX_AGE_SECONDS', 86400))
+    
+    # Prometheus metrics - API /metrics'te, worker ve outbox relay ayrı portta yayınlar
+    METRICS_ENABLED: bool = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    WORKER_METRICS_PORT: int = int(os.getenv('WORKER_METRICS_PORT', 9101))
+    OUTBOX_RELAY_METRICS_PORT: int = int(os.getenv('OUTBOX_RELAY_METRICS_PORT', 9102))
+    
     # First superuser settings
     FIRST_SUPERUSER: str = os.getenv('FIRST_SUPERUSER', 'admin@example.com')
     FIRST_SUPERUSER_PASSWORD: str = os.getenv('FIRST_SUPERUSER_PASSWORD', 'admin123')
     
     # App settings
-    WORKERS: int = int(os.getenv('WORKERS', 1))
+    WORKERS: int = int(os.getenv('WORKERS', 1))  # gunicorn.conf.py (production) ve python main.py
+    # true: admin kullanıcısı lifespan startup'ında oluşturulur (local geliştirme).
+    # Production'da false; deploy'da bir kez çalıştırılır: python -m app.db.init_db
+    INIT_DB_ON_STARTUP: bool = os.getenv('INIT_DB_ON_STARTUP', 'true').lower() in ('1', 'true', 'yes')
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+import redis
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_RETRY_INTERVAL_SECONDS = 5
+
+
+@dataclass
+class SummaryCacheStats:
+    local_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    local_evictions: int = 0
+    redis_errors: int = 0
+    stores: int = 0
+
+
+class SummaryCache:
+    # İki katmanlı summary cache: process içi LRU + paylaşılan Redis.
+    # Redis tarafında boyut sınırı maxmemory + LRU policy ile sağlanır (docker-compose.yml redis_cache);
+    # anahtarlar TTL ile yazılır, paylaşılan Redis'te volatile-lru ile de çalışır.
+    # Redis hataları cache miss sayılır, summarization'ı durdurmaz.
+    def __init__(self, version: str, local_size: int, ttl_seconds: int, redis_url: str, redis_timeout: float, enabled: bool = True):
+        self.enabled = enabled
+        self.version = version
+        self.local_size = local_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self.redis_timeout = redis_timeout
+        self.stats = SummaryCacheStats()
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis: Optional[redis.Redis] = None
+        # Redis hata verince bir süre denenmez, her istek timeout beklemesin
+        self._redis_retry_at = 0.0
+
+    def key(self, raw_text: str) -> str:
+        return self.key_for_digest(hashlib.sha256(raw_text.encode("utf-8")).hexdigest())
+
+    def key_for_digest(self, digest: str) -> str:
+        # büyük notlarda digest stream edilirken hesaplanır, metin bellekte tutulmaz
+        return f"summary:{self.version}:{digest}"
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                self.redis_url,
+                socket_timeout=self.redis_timeout,
+                socket_connect_timeout=self.redis_timeout,
+                decode_responses=True,
+            )
+        return self._redis
+
+    def get(self, raw_text: str) -> Optional[str]:
+        return self.get_many([raw_text])[0]
+
+    def get_many(self, raw_texts: List[str]) -> List[Optional[str]]:
+        return self.get_many_by_key([self.key(text) for text in raw_texts])
+
+    def get_many_by_key(self, keys: List[str]) -> List[Optional[str]]:
+        if not self.enabled:
+            return [None] * len(keys)
+        results: List[Optional[str]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                summary = self._local.get(key)
+                if summary is not None:
+                    self._local.move_to_end(key)
+                    self.stats.local_hits += 1
+                    results[i] = summary
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing:
+            redis_keys = list(missing)
+            values = [None] * len(redis_keys)
+            if self._redis_available():
+                try:
+                    values = self.redis.mget(redis_keys)
+                except redis.RedisError as e:
+                    self._redis_failed("lookup", e)
+
+            for key, summary in zip(redis_keys, values):
+                positions = missing[key]
+                if summary is None:
+                    with self._lock:
+                        self.stats.misses += len(positions)
+                    continue
+                with self._lock:
+                    self.stats.redis_hits += len(positions)
+                self._store_local(key, summary)
+                for i in positions:
+                    results[i] = summary
+
+        return results
+
+    def set(self, raw_text: str, summary: str) -> None:
+        self.set_many({raw_text: summary})
+
+    def set_many(self, summaries: Dict[str, str]) -> None:
+        self.set_many_by_key({self.key(text): summary for text, summary in summaries.items()})
+
+    def set_many_by_key(self, entries: Dict[str, str]) -> None:
+        if not self.enabled or not entries:
+            return
+        for key, summary in entries.items():
+            self._store_local(key, summary)
+        if self._redis_available():
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, summary in entries.items():
+                    pipe.set(key, summary, ex=self.ttl_seconds)
+                pipe.execute()
+            except redis.RedisError as e:
+                self._redis_failed("store", e)
+        with self._lock:
+            self.stats.stores += len(entries)
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, operation: str, exc: Exception) -> None:
+        logger.warning(f"Summary cache Redis {operation} failed: {exc}")
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL_SECONDS
+        with self._lock:
+            self.stats.redis_errors += 1
+
+    def _store_local(self, key: str, summary: str) -> None:
+        with self._lock:
+            self._local[key] = summary
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+                self.stats.local_evictions += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = asdict(self.stats)
+        stats["local_entries"] = len(self._local)
+        return stats
+
+    def redis_evictions(self) -> Optional[int]:
+        # Redis'in maxmemory nedeniyle attığı key sayısı (tüm instance için)
+        try:
+            return int(self.redis.info("stats").get("evicted_keys", 0))
+        except redis.RedisError:
+            return None
+
+
+summary_cache = SummaryCache(
+    version=f"{settings.SUMMARIZER_ENGINE}-{settings.SUMMARIZER_VERSION}",
+    local_size=settings.SUMMARY_CACHE_LOCAL_SIZE,
+    ttl_seconds=settings.SUMMARY_CACHE_TTL_SECONDS,
+    redis_url=settings.SUMMARY_CACHE_REDIS_URL,
+    redis_timeout=settings.SUMMARY_CACHE_REDIS_TIMEOUT_MS / 1000,
+    enabled=settings.SUMMARY_CACHE_ENABLED,
+)
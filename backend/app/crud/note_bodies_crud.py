@@ -0,0 +1,127 @@
+import codecs
+import io
+from typing import Dict, Iterator, List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.settings import settings
+from app.models.note_bodies import NoteBody
+from app.models.notes import Note
+
+try:
+    import zstandard
+except ImportError:  # NOTE_BODY_STORAGE=inline ise gerekmez
+    zstandard = None
+
+ZSTD_CODEC = "zstd"
+
+
+def compressed_storage_enabled() -> bool:
+    return settings.NOTE_BODY_STORAGE == ZSTD_CODEC
+
+
+def _require_zstd() -> None:
+    if zstandard is None:
+        raise RuntimeError("zstandard is not installed (required for compressed note bodies)")
+
+
+def compress_body(raw_text: str) -> bytes:
+    _require_zstd()
+    return zstandard.ZstdCompressor(level=settings.NOTE_BODY_ZSTD_LEVEL).compress(raw_text.encode("utf-8"))
+
+
+def decompress_body(data: bytes) -> str:
+    _require_zstd()
+    # stream_reader ile açılır; compress() frame'e içerik boyutunu yazar ama buna güvenilmez
+    with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+        return reader.read().decode("utf-8")
+
+
+def iter_decompressed(data: bytes, chunk_chars: int) -> Iterator[str]:
+    # büyük notlar için: text parça parça açılır, tamamı bellekte tutulmaz
+    _require_zstd()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+        while True:
+            chunk = reader.read(chunk_chars)
+            if not chunk:
+                break
+            yield decoder.decode(chunk)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def decompress_prefix(data: bytes, chars: int) -> str:
+    # excerpt için sadece baştaki kısım açılır (utf-8'de karakter başına en fazla 4 byte)
+    _require_zstd()
+    with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+        prefix = reader.read(chars * 4)
+    return codecs.getincrementaldecoder("utf-8")().decode(prefix)[:chars]
+
+
+def body_rows(note_ids: List[str], raw_texts: List[str]) -> List[dict]:
+    # note_bodies INSERT'i için satırlar; notes.raw_text bu notlarda "" yazılır
+    return [
+        {"note_id": note_id, "codec": ZSTD_CODEC, "raw_size": len(raw_text), "data": compress_body(raw_text)}
+        for note_id, raw_text in zip(note_ids, raw_texts)
+    ]
+
+
+def add_note_bodies(db: Session, note_ids: List[str], raw_texts: List[str]) -> None:
+    # commit etmez, çağıran note ile aynı transaction'da commit eder
+    if note_ids:
+        db.execute(insert(NoteBody), body_rows(note_ids, raw_texts))
+
+
+def load_note_bodies(db: Session, note_ids: List[str]) -> Dict[str, str]:
+    if not note_ids:
+        return {}
+    rows = db.execute(select(NoteBody.note_id, NoteBody.data).where(NoteBody.note_id.in_(note_ids)))
+    return {note_id: decompress_body(data) for note_id, data in rows}
+
+
+def note_text_length():
+    # sıkıştırılmış notlarda raw_size, diğerlerinde length(raw_text)
+    stored_size = select(NoteBody.raw_size).where(NoteBody.note_id == Note.id).scalar_subquery()
+    return func.coalesce(stored_size, func.length(Note.raw_text))
+
+
+def attach_bodies(db: Session, notes: List[Note]) -> None:
+    # raw_text'i boş olan notların text'i note_bodies'den açılıp yerleştirilir.
+    # set_committed_value ile yazılır, note dirty olmaz (commit'te notes.raw_text'e yazılmaz)
+    empty = [note for note in notes if note.raw_text == ""]
+    bodies = load_note_bodies(db, [note.id for note in empty])
+    for note in empty:
+        if note.id in bodies:
+            set_committed_value(note, "raw_text", bodies[note.id])
+
+
+def attach_excerpts(db: Session, notes: List[Note], excerpt_chars: int) -> None:
+    # view=summary'de excerpt SQL'de substr ile gelir; sıkıştırılmış notlarda "" döner, burada doldurulur
+    empty = {note.id: note for note in notes if note.excerpt == ""}
+    if not empty:
+        return
+    rows = db.execute(select(NoteBody.note_id, NoteBody.data).where(NoteBody.note_id.in_(list(empty))))
+    for note_id, data in rows:
+        set_committed_value(empty[note_id], "excerpt", decompress_prefix(data, excerpt_chars))
+
+
+# liste fast path'i ORM objesi yerine dict satırlarla çalışır
+def fill_row_bodies(db: Session, rows: List[dict]) -> None:
+    empty = [row for row in rows if row["raw_text"] == ""]
+    bodies = load_note_bodies(db, [row["id"] for row in empty])
+    for row in empty:
+        if row["id"] in bodies:
+            row["raw_text"] = bodies[row["id"]]
+
+
+def fill_row_excerpts(db: Session, rows: List[dict], excerpt_chars: int) -> None:
+    empty = {row["id"]: row for row in rows if row["excerpt"] == ""}
+    if not empty:
+        return
+    found = db.execute(select(NoteBody.note_id, NoteBody.data).where(NoteBody.note_id.in_(list(empty))))
+    for note_id, data in found:
+        empty[note_id]["excerpt"] = decompress_prefix(data, excerpt_chars)
@@ -0,0 +1,184 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, extract, func, insert, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import run_db
+from app.models.base import generate_id
+from app.models.note_stats import NoteStat, NoteStatDelta
+from app.models.notes import Note, Status
+
+# bir rollup transaction'ında toplanan en fazla delta satırı
+ROLLUP_BATCH_SIZE = 10000
+
+# (user_id, status, count farkı, completion_seconds farkı)
+StatChange = Tuple[str, Status, int, float]
+
+
+def completion_seconds(created_at: datetime, completed_at: datetime) -> float:
+    # SQLite timezone'suz datetime döner
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    if completed_at.tzinfo is None:
+        completed_at = completed_at.replace(tzinfo=timezone.utc)
+    return max((completed_at - created_at).total_seconds(), 0.0)
+
+
+def status_change(user_id: str, old: Optional[Status], new: Optional[Status], seconds: float = 0.0) -> List[StatChange]:
+    # old None: yeni not, new None: silinen not. seconds notun completion süresidir,
+    # sadece COMPLETED'a giren / çıkan tarafa yazılır
+    if old == new:
+        return []
+    changes: List[StatChange] = []
+    if old is not None:
+        changes.append((user_id, old, -1, -seconds if old == Status.COMPLETED else 0.0))
+    if new is not None:
+        changes.append((user_id, new, 1, seconds if new == Status.COMPLETED else 0.0))
+    return changes
+
+
+def sum_changes(changes: Iterable[StatChange]) -> Dict[Tuple[str, Status], List[float]]:
+    totals: Dict[Tuple[str, Status], List[float]] = defaultdict(lambda: [0, 0.0])
+    for user_id, status, count, seconds in changes:
+        total = totals[(user_id, status)]
+        total[0] += count
+        total[1] += seconds
+    return totals
+
+
+def record_stat_changes(db: Session, changes: Iterable[StatChange]) -> None:
+    # (user_id, status) başına toplanıp tek executemany INSERT. commit etmez - status'u değiştiren
+    # transaction'da çağrılır, böylece sayaçlar notlarla birlikte commit / rollback olur
+    rows = [
+        {"id": generate_id(), "user_id": user_id, "status": status, "count": count, "completion_seconds": seconds}
+        for (user_id, status), (count, seconds) in sum_changes(changes).items()
+        if count or seconds
+    ]
+    if rows:
+        db.execute(insert(NoteStatDelta), rows)
+
+
+def _upsert(db: Session):
+    # (user_id, status) varsa sayaçlara eklenir
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(NoteStat)
+    return stmt.on_conflict_do_update(
+        index_elements=[NoteStat.user_id, NoteStat.status],
+        set_={
+            "count": NoteStat.count + stmt.excluded.count,
+            "completion_seconds": NoteStat.completion_seconds + stmt.excluded.completion_seconds,
+        },
+    )
+
+
+def rollup_stat_deltas(db: Session) -> int:
+    # birikmiş delta'lar note_stats'a toplanıp silinir, batch başına bir transaction.
+    # Okumalar delta'ları zaten hesaba kattığı için bu sadece okuma maliyetini küçük tutar.
+    rolled = 0
+    while True:
+        batch = select(NoteStatDelta.id).limit(ROLLUP_BATCH_SIZE).scalar_subquery()
+        deltas = db.execute(
+            delete(NoteStatDelta)
+            .where(NoteStatDelta.id.in_(batch))
+            .returning(NoteStatDelta.user_id, NoteStatDelta.status, NoteStatDelta.count, NoteStatDelta.completion_seconds)
+        ).all()
+        if not deltas:
+            db.rollback()
+            return rolled
+        totals = sum_changes(deltas)
+        # aynı sırayla kilitlenir, paralel rollup'lar deadlock olmaz
+        rows = [
+            {"user_id": user_id, "status": status, "count": count, "completion_seconds": seconds}
+            for (user_id, status), (count, seconds) in sorted(totals.items(), key=lambda item: (item[0][0], item[0][1].value))
+        ]
+        db.execute(_upsert(db), rows)
+        db.commit()
+        rolled += len(deltas)
+        if len(deltas) < ROLLUP_BATCH_SIZE:
+            return rolled
+
+
+def _note_completion_seconds(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return extract("epoch", Note.updated_at - Note.created_at)
+    return (func.julianday(Note.updated_at) - func.julianday(Note.created_at)) * 86400
+
+
+def _current_counts(db: Session) -> Dict[Tuple[str, Status], Tuple[int, float]]:
+    # note_stats + henüz toplanmamış delta'lar, tek statement (aynı snapshot)
+    combined = union_all(
+        select(NoteStat.user_id, NoteStat.status, NoteStat.count, NoteStat.completion_seconds),
+        select(NoteStatDelta.user_id, NoteStatDelta.status, NoteStatDelta.count, NoteStatDelta.completion_seconds),
+    ).subquery()
+    rows = db.execute(
+        select(combined.c.user_id, combined.c.status, func.sum(combined.c.count), func.sum(combined.c.completion_seconds))
+        .group_by(combined.c.user_id, combined.c.status)
+    ).all()
+    return {(user_id, Status(status)): (int(count or 0), float(seconds or 0.0)) for user_id, status, count, seconds in rows}
+
+
+def reconcile_note_stats(db: Session) -> int:
+    # note_stats notes'tan yeniden sayılır (yarıda kalan task'lar, delta yazmayan elle yapılan UPDATE'ler).
+    # Postgres'te REPEATABLE READ: sayımla aynı snapshot'ta görünen delta'lar silinir, sayımdan sonra commit
+    # edilenler kalır ve yeni sayımın üstüne eklenir. Düzeltilen (user_id, status) sayısını döner.
+    # Yeni bir session ile çağrılmalı (isolation level transaction başında verilir).
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    seconds = _note_completion_seconds(db)
+    recount = db.execute(
+        select(
+            Note.user_id,
+            Note.status,
+            func.count(),
+            func.sum(case((Note.status == Status.COMPLETED, seconds), else_=0)),
+        ).group_by(Note.user_id, Note.status)
+    ).all()
+    counts = {(user_id, status): (count, float(total or 0.0)) for user_id, status, count, total in recount}
+
+    current = _current_counts(db)
+    drifted = sum(
+        1 for key in counts.keys() | current.keys()
+        if counts.get(key, (0, 0.0))[0] != current.get(key, (0, 0.0))[0]
+    )
+
+    db.execute(delete(NoteStatDelta))
+    db.execute(delete(NoteStat))
+    if counts:
+        db.execute(insert(NoteStat), [
+            {"user_id": user_id, "status": status, "count": count, "completion_seconds": total}
+            for (user_id, status), (count, total) in counts.items()
+        ])
+    db.commit()
+    return drifted
+
+
+def get_note_stats(db: Session) -> dict:
+    # sayaçlardan okunur (notes taranmaz): kullanıcı x status satırı + bekleyen delta'lar kadar iş
+    counts = _current_counts(db)
+    by_status = {status.value: 0 for status in Status}
+    by_user: Dict[str, Dict[str, int]] = {}
+    completed_seconds = 0.0
+    for (user_id, status), (count, seconds) in counts.items():
+        if not count:
+            continue
+        by_status[status.value] += count
+        by_user.setdefault(user_id, {s.value: 0 for s in Status})[status.value] = count
+        if status == Status.COMPLETED:
+            completed_seconds += seconds
+
+    completed = by_status[Status.COMPLETED.value]
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_user": by_user,
+        "backlog": by_status[Status.QUEUED.value] + by_status[Status.IN_PROGRESS.value],
+        "avg_completion_seconds": completed_seconds / completed if completed else None,
+    }
+
+
+async def get_note_stats_async(db: Session | AsyncSession) -> dict:
+    return await run_db(db, get_note_stats)
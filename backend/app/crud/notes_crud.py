@@ -0,0 +1,470 @@
+import base64
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, delete, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, with_expression
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.crud.note_bodies_crud import (
+    add_note_bodies,
+    attach_bodies,
+    attach_excerpts,
+    compressed_storage_enabled,
+    fill_row_bodies,
+    fill_row_excerpts,
+    note_text_length,
+)
+from app.core.search_index import search_index
+from app.core.settings import settings
+from app.crud.note_stats_crud import completion_seconds, record_stat_changes, status_change
+from app.crud.outbox_crud import LANES, add_summarize_events, summary_lane
+from app.crud.search_crud import index_notes, search_vector_expression, text_search_config, uses_tsvector
+from app.db.session import run_db
+from app.models.base import generate_id, is_valid_id
+from app.models.notes import Note, Status
+from app.schemas.notes import NoteView
+from app.schemas.users import Role
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SEARCH_SCOPE_BATCH_SIZE = 500
+
+
+def encode_cursor(note) -> str:
+    # cursor, sayfanın son notunun (created_at, id) ikilisidir
+    raw = f"{note.created_at.isoformat()}|{note.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, note_id = raw.split("|", 1)
+        if not is_valid_id(note_id):
+            raise ValueError("Invalid note id")
+        return datetime.fromisoformat(created_at), note_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+# liste sorgusu ORM entity yerine bu kolonları tuple olarak çeker (NoteRow / NoteSummaryRow)
+NOTE_COLUMNS = (Note.id, Note.raw_text, Note.summary, Note.status, Note.user_id, Note.created_at, Note.updated_at)
+
+
+def note_view_columns(view: NoteView = NoteView.FULL, excerpt_chars: Optional[int] = None) -> list:
+    if view == NoteView.FULL:
+        return list(NOTE_COLUMNS)
+    columns = [column for column in NOTE_COLUMNS if column is not Note.raw_text]
+    if excerpt_chars:
+        columns.append(func.substr(Note.raw_text, 1, excerpt_chars).label("excerpt"))
+    return columns
+
+
+def note_view_options(view: NoteView = NoteView.FULL, excerpt_chars: Optional[int] = None) -> list:
+    if view == NoteView.FULL:
+        return []
+    # raiseload: raw_text yanlışlıkla erişilirse lazy load yerine hata (sessizce geri yüklenmez)
+    options = [defer(Note.raw_text, raiseload=True)]
+    if excerpt_chars:
+        options.append(with_expression(Note.excerpt, func.substr(Note.raw_text, 1, excerpt_chars)))
+    return options
+
+
+def load_view(db: Session, notes: List[Note], view: NoteView = NoteView.FULL, excerpt_chars: Optional[int] = None) -> None:
+    # sıkıştırılmış (note_bodies) notların text'i / excerpt'i tamamlanır
+    if view == NoteView.FULL:
+        attach_bodies(db, notes)
+    elif excerpt_chars:
+        attach_excerpts(db, notes, excerpt_chars)
+
+
+def owner_criteria(user) -> list:
+    # Agents and others can only see their own notes (sahiplik sorgunun içinde kontrol edilir)
+    return [] if user.role == Role.ADMIN else [Note.user_id == user.id]
+
+
+def filter_notes(
+    query: Select,
+    user,
+    cursor: Optional[str] = None,
+    status: Optional[Status] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Select:
+    query = query.where(*owner_criteria(user))
+    if status is not None:
+        query = query.where(Note.status == status)
+    if created_after is not None:
+        query = query.where(Note.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(Note.created_at < created_before)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(Note.created_at, Note.id) < tuple_(cursor_created_at, cursor_id))
+    return query
+
+
+def notes_page_query(
+    user,
+    limit: int = DEFAULT_PAGE_SIZE,
+    view: NoteView = NoteView.FULL,
+    excerpt_chars: Optional[int] = None,
+    **filters,
+) -> Select:
+    # newest first; (created_at, id) index'leri üzerinden keyset pagination
+    query = filter_notes(select(*note_view_columns(view, excerpt_chars)), user, **filters)
+
+    # bir fazla satır çekilir, sonraki sayfa var mı anlamak için
+    return query.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit + 1)
+
+
+def page_version(rows: list, has_next: bool) -> tuple:
+    # liste ETag'i: sayfadaki notların (id, updated_at)'i + sonraki sayfa var mı (limit+1. satır).
+    # Sayfaya giren / çıkan / değişen not ETag'i değiştirir; kapsamın geri kalanı taranmaz
+    return tuple((row["id"], row["updated_at"]) for row in rows), has_next
+
+
+def get_notes_page_version(db: Session, user, limit: int = DEFAULT_PAGE_SIZE, **filters) -> tuple:
+    # If-None-Match için: sayfa sorgusunun aynısı ama sadece (id, updated_at) - maliyeti sayfayı okumaktan fazla olmaz
+    query = filter_notes(select(Note.id, Note.updated_at), user, **filters)
+    rows = db.execute(query.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit + 1)).mappings().all()
+    return page_version(rows[:limit], len(rows) > limit)
+
+
+def split_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+def get_notes_page(
+    db: Session,
+    user,
+    limit: int = DEFAULT_PAGE_SIZE,
+    view: NoteView = NoteView.FULL,
+    excerpt_chars: Optional[int] = None,
+    **filters,
+) -> Tuple[List[dict], Optional[str]]:
+    # ORM objesi oluşturulmaz, satırlar dict olarak döner (bkz. schemas.notes.NoteRow)
+    result = db.execute(notes_page_query(user, limit=limit, view=view, excerpt_chars=excerpt_chars, **filters))
+    page, next_cursor = split_page(result.all(), limit)
+    return view_rows(db, page, view, excerpt_chars), next_cursor
+
+
+def view_rows(db: Session, page: list, view: NoteView = NoteView.FULL, excerpt_chars: Optional[int] = None) -> List[dict]:
+    rows = [row._asdict() for row in page]
+    if view == NoteView.FULL:
+        fill_row_bodies(db, rows)
+    elif excerpt_chars:
+        fill_row_excerpts(db, rows, excerpt_chars)
+    else:
+        for row in rows:
+            row["excerpt"] = None
+    return rows
+
+
+def encode_search_cursor(offset: int) -> str:
+    # arama sonuçları rank'e göre sıralı, cursor sonraki sayfanın offset'idir
+    return base64.urlsafe_b64encode(f"search|{offset}".encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> int:
+    try:
+        prefix, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        if prefix != "search" or int(offset) < 0:
+            raise ValueError("Invalid cursor")
+        return int(offset)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def visible_ranked_ids(db: Session, user, ranked: List[str], count: int) -> List[str]:
+    # in-process index'in sıralı sonuçları DB'de süzülür (scoping + silinmiş notlar), ilk count tanesi
+    visible: List[str] = []
+    for i in range(0, len(ranked), SEARCH_SCOPE_BATCH_SIZE):
+        chunk = ranked[i:i + SEARCH_SCOPE_BATCH_SIZE]
+        found = set(db.scalars(filter_notes(select(Note.id), user).where(Note.id.in_(chunk))))
+        visible.extend(note_id for note_id in chunk if note_id in found)
+        if len(visible) >= count:
+            break
+    return visible[:count]
+
+
+def search_notes(
+    db: Session,
+    user,
+    q: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    view: NoteView = NoteView.FULL,
+    excerpt_chars: Optional[int] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    # raw_text + summary full-text araması, rank'e göre; get_notes ile aynı admin/agent scoping
+    offset = decode_search_cursor(cursor) if cursor else 0
+    columns = note_view_columns(view, excerpt_chars)
+    if uses_tsvector(db):
+        # websearch syntax: "kelime grubu", -hariç, or
+        tsquery = func.websearch_to_tsquery(text_search_config(), q)
+        rank = func.ts_rank_cd(Note.search_vector, tsquery)
+        query = (
+            filter_notes(select(*columns), user)
+            .where(Note.search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), Note.created_at.desc(), Note.id.desc())
+            .offset(offset)
+            .limit(limit + 1)
+        )
+        page = db.execute(query).all()
+    else:
+        search_index.refresh(db)
+        page_ids = visible_ranked_ids(db, user, search_index.search(q), offset + limit + 1)[offset:]
+        found = {row.id: row for row in db.execute(select(*columns).where(Note.id.in_(page_ids)))}
+        page = [found[note_id] for note_id in page_ids if note_id in found]
+
+    next_cursor = encode_search_cursor(offset + limit) if len(page) > limit else None
+    return view_rows(db, page[:limit], view, excerpt_chars), next_cursor
+
+
+def create_note(db: Session, user_id: str, raw_text: str, summary: Optional[str] = None) -> Note:
+    # summary cache'te varsa not direkt COMPLETED yazılır, summarization task'ı gerekmez.
+    # Yoksa QUEUED yazılır ve summarization task'ı outbox'a aynı commit ile eklenir.
+    compressed = compressed_storage_enabled()
+    db_note = Note(
+        id=generate_id(),
+        raw_text="" if compressed else raw_text,
+        summary=summary or "",  # Will be filled by background job
+        status=Status.COMPLETED if summary is not None else Status.QUEUED,
+        user_id=user_id
+    )
+    if summary is not None:
+        # QUEUED notlar worker summary'yi yazınca index'lenir
+        db_note.search_vector = search_vector_expression(db, raw_text, summary)
+    db.add(db_note)
+    if compressed:
+        # note_bodies FK'si için note önce flush edilir (session autoflush=False)
+        db.flush()
+        add_note_bodies(db, [db_note.id], [raw_text])
+    if summary is None:
+        add_summarize_events(db, [db_note.id], user_id=user_id, lane=summary_lane(len(raw_text)))
+    record_stat_changes(db, status_change(user_id, None, db_note.status))
+    db.commit()
+    if compressed:
+        set_committed_value(db_note, "raw_text", raw_text)
+    return db_note
+
+
+def bulk_create_notes(db: Session, user_id: str, raw_texts: List[str], summaries: Optional[List[Optional[str]]] = None) -> List[str]:
+    # tek executemany INSERT (SQLAlchemy çok satırlı VALUES'a çevirir) + outbox + tek commit
+    summaries = summaries or [None] * len(raw_texts)
+    compressed = compressed_storage_enabled()
+    rows = [
+        {
+            "id": generate_id(),
+            "raw_text": "" if compressed else raw_text,
+            "summary": summary or "",
+            "status": Status.COMPLETED if summary is not None else Status.QUEUED,
+            "user_id": user_id,
+        }
+        for raw_text, summary in zip(raw_texts, summaries)
+    ]
+    db.execute(insert(Note), rows)
+    if compressed:
+        add_note_bodies(db, [row["id"] for row in rows], raw_texts)
+    # cache'ten COMPLETED gelenler hemen, QUEUED olanlar worker summary'yi yazınca index'lenir
+    index_notes(db, [
+        (row["id"], raw_text, row["summary"]) for row, raw_text in zip(rows, raw_texts) if row["status"] == Status.COMPLETED
+    ])
+    # kısa ve uzun notlar ayrı lane'lere (kuyruklara) gider
+    queued = {lane: [] for lane in LANES}
+    for row, raw_text in zip(rows, raw_texts):
+        if row["status"] == Status.QUEUED:
+            queued[summary_lane(len(raw_text))].append(row["id"])
+    for lane, note_ids in queued.items():
+        add_summarize_events(db, note_ids, user_id=user_id, lane=lane)
+    record_stat_changes(db, [change for row in rows for change in status_change(user_id, None, row["status"])])
+    db.commit()
+    return [row["id"] for row in rows]
+
+
+def get_note_version(db: Session, note_id: str, user=None):
+    # tek not ETag'i için dar satır (id, user_id, status, updated_at) - body yüklenmez.
+    # user verilirse başkasının notu için None (sahiplik WHERE'de)
+    return db.execute(
+        select(Note.id, Note.user_id, Note.status, Note.updated_at)
+        .where(Note.id == note_id, *(owner_criteria(user) if user is not None else []))
+    ).one_or_none()
+
+
+def get_note(db: Session, note_id: str, view: NoteView = NoteView.FULL, excerpt_chars: Optional[int] = None, user=None) -> Optional[Note]:
+    # user verilirse sahiplik WHERE'de kontrol edilir, başkasının notu hiç yüklenmez
+    query = select(Note).options(*note_view_options(view, excerpt_chars)).where(Note.id == note_id)
+    if user is not None:
+        query = query.where(*owner_criteria(user))
+    note = db.scalars(query).first()
+    if note is not None:
+        load_view(db, [note], view, excerpt_chars)
+    return note
+
+
+def get_note_owner(db: Session, note_id: str) -> Optional[str]:
+    # sahiplik koşullu sorgu boş döndüğünde 404 / 403 ayrımı için (sadece bu yolda çalışır)
+    return db.scalar(select(Note.user_id).where(Note.id == note_id))
+
+
+def note_completion_seconds(note: Note) -> float:
+    # COMPLETED notlarda updated_at tamamlanma anıdır
+    return completion_seconds(note.created_at, note.updated_at)
+
+
+def delete_notes_where(db: Session, *criteria) -> list:
+    # tek DELETE ... RETURNING, note stats delta'ları aynı transaction'da. commit etmez.
+    # note_bodies satırları FK'deki ON DELETE CASCADE ile silinir
+    deleted = db.execute(
+        delete(Note)
+        .where(*criteria)
+        .returning(Note.id, Note.user_id, Note.status, Note.created_at, Note.updated_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    record_stat_changes(db, [
+        change for row in deleted
+        for change in status_change(row.user_id, row.status, None, note_completion_seconds(row) if row.status == Status.COMPLETED else 0.0)
+    ])
+    return deleted
+
+
+def delete_note(db: Session, note_id: str, user) -> bool:
+    # DELETE ... WHERE id = ? AND (user_id = ? | admin) RETURNING - önce SELECT yok.
+    # False: not yok ya da başkasının (ayrım get_note_owner ile)
+    deleted = delete_notes_where(db, Note.id == note_id, *owner_criteria(user))
+    db.commit()
+    return bool(deleted)
+
+
+def delete_notes_in_batches(
+    db: Session,
+    candidates: Select,
+    batch_size: int,
+    max_rows: Optional[int] = None,
+    pause_seconds: float = 0.0,
+) -> int:
+    # candidates: silinecek Note.id'leri seçen sorgu. Batch başına ayrı transaction, lock'lar kısa tutulur
+    deleted = 0
+    while max_rows is None or deleted < max_rows:
+        limit = batch_size if max_rows is None else min(batch_size, max_rows - deleted)
+        batch = len(delete_notes_where(db, Note.id.in_(candidates.limit(limit).scalar_subquery())))
+        db.commit()
+        deleted += batch
+        if batch < limit:
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    return deleted
+
+
+def bulk_delete_notes(
+    db: Session,
+    user,
+    ids: Optional[List[str]] = None,
+    status: Optional[Status] = None,
+    created_before: Optional[datetime] = None,
+) -> int:
+    # filtrelerin hepsine uyan notlar (agent'larda sadece kendi notları) silinir, silinen sayısı döner
+    candidates = filter_notes(select(Note.id), user, status=status, created_before=created_before)
+    if ids is not None:
+        # geçersiz id'ler hiçbir notla eşleşmez, sorguya girmez
+        candidates = candidates.where(Note.id.in_([note_id for note_id in ids if is_valid_id(note_id)]))
+    return delete_notes_in_batches(db, candidates, settings.BULK_DELETE_BATCH_SIZE)
+
+
+def purge_expired_notes(
+    db: Session,
+    created_before: datetime,
+    batch_size: int,
+    max_rows: Optional[int] = None,
+    pause_seconds: float = 0.0,
+) -> int:
+    # retention: created_before'dan eski COMPLETED / FAILED notlar, en eskiler önce (ix_notes_status_created_at).
+    # QUEUED / IN_PROGRESS notlara dokunulmaz; worker'ın kilitlediği satırlar atlanır, bir sonraki tura kalır
+    candidates = (
+        select(Note.id)
+        .where(Note.status.in_([Status.COMPLETED, Status.FAILED]), Note.created_at < created_before)
+        .order_by(Note.created_at)
+        .with_for_update(skip_locked=True)
+    )
+    return delete_notes_in_batches(db, candidates, batch_size, max_rows, pause_seconds)
+
+
+def requeue_stale_claims(db: Session, claimed_before: datetime, batch_size: int) -> list:
+    # claim edilip bitirilmeyen notlar (worker crash / OOM / hard time limit - task'ın except'i hiç çalışmaz):
+    # claim updated_at'i yeniler, IN_PROGRESS'te updated_at'i claimed_before'dan eski olanlar tekrar QUEUED
+    # yapılır ve yeni summarize event'i yazılır (redeliver edilen mesaj QUEUED olmayan notu almaz).
+    # Batch'ler halinde, her batch ayrı transaction; (id, user_id) satırlarını döner
+    text_length = note_text_length()
+    requeued = []
+    while True:
+        candidates = (
+            select(Note.id)
+            .where(Note.status == Status.IN_PROGRESS, Note.updated_at < claimed_before)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = db.execute(
+            update(Note)
+            .where(Note.id.in_(candidates.scalar_subquery()))
+            .values(status=Status.QUEUED, updated_at=datetime.now(timezone.utc))
+            .returning(Note.id, Note.user_id, text_length.label("length"))
+        ).all()
+        events = {}
+        for row in rows:
+            events.setdefault((row.user_id, summary_lane(row.length)), []).append(row.id)
+        for (user_id, lane), note_ids in events.items():
+            add_summarize_events(db, note_ids, user_id=user_id, lane=lane)
+        record_stat_changes(db, [c for row in rows for c in status_change(row.user_id, Status.IN_PROGRESS, Status.QUEUED)])
+        db.commit()
+        requeued.extend((row.id, row.user_id) for row in rows)
+        if len(rows) < batch_size:
+            return requeued
+
+
+# Async variants - API endpoint'leri event loop'u bloklamadan kullanır
+async def get_notes_page_async(db: Session | AsyncSession, user, limit: int = DEFAULT_PAGE_SIZE, **filters) -> Tuple[List[dict], Optional[str]]:
+    return await run_db(db, get_notes_page, user, limit, **filters)
+
+
+async def get_notes_page_version_async(db: Session | AsyncSession, user, limit: int = DEFAULT_PAGE_SIZE, **filters) -> tuple:
+    return await run_db(db, get_notes_page_version, user, limit, **filters)
+
+
+async def create_note_async(db: Session | AsyncSession, user_id: str, raw_text: str, summary: Optional[str] = None) -> Note:
+    return await run_db(db, create_note, user_id, raw_text, summary)
+
+
+async def bulk_create_notes_async(db: Session | AsyncSession, user_id: str, raw_texts: List[str], summaries: Optional[List[Optional[str]]] = None) -> List[str]:
+    return await run_db(db, bulk_create_notes, user_id, raw_texts, summaries)
+
+
+async def search_notes_async(db: Session | AsyncSession, user, q: str, limit: int = DEFAULT_PAGE_SIZE, **options) -> Tuple[List[dict], Optional[str]]:
+    return await run_db(db, search_notes, user, q, limit, **options)
+
+
+async def get_note_version_async(db: Session | AsyncSession, note_id: str, user=None):
+    return await run_db(db, get_note_version, note_id, user)
+
+
+async def get_note_async(db: Session | AsyncSession, note_id: str, view: NoteView = NoteView.FULL, excerpt_chars: Optional[int] = None, user=None) -> Optional[Note]:
+    return await run_db(db, get_note, note_id, view, excerpt_chars, user)
+
+
+async def get_note_owner_async(db: Session | AsyncSession, note_id: str) -> Optional[str]:
+    return await run_db(db, get_note_owner, note_id)
+
+
+async def delete_note_async(db: Session | AsyncSession, note_id: str, user) -> bool:
+    return await run_db(db, delete_note, note_id, user)
+
+
+async def bulk_delete_notes_async(db: Session | AsyncSession, user, **filters) -> int:
+    return await run_db(db, bulk_delete_notes, user, **filters)
@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.base import generate_id
+from app.models.outbox import OutboxEvent
+
+SUMMARIZE_TASK = 'worker.summarize_notes_batch'
+
+# kısa notlar fast lane'de, ayrı kuyrukta özetlenir
+FAST_LANE = 'fast'
+DEFAULT_LANE = 'default'
+LANES = (FAST_LANE, DEFAULT_LANE)
+
+
+def summary_lane(length: int) -> str:
+    return FAST_LANE if length <= settings.SUMMARY_FAST_LANE_MAX_CHARS else DEFAULT_LANE
+
+
+def lane_queue(lane: str) -> str:
+    return settings.SUMMARY_FAST_QUEUE if lane == FAST_LANE else settings.SUMMARY_DEFAULT_QUEUE
+
+
+def add_summarize_events(db: Session, note_ids: List[str], user_id: Optional[str] = None, lane: str = DEFAULT_LANE) -> None:
+    # commit etmez - note insert'i ile aynı transaction'da yazılmalı
+    batch_size = settings.SUMMARY_BATCH_SIZE
+    rows = [
+        {
+            "id": generate_id(),
+            "task_name": SUMMARIZE_TASK,
+            "args": [note_ids[i:i + batch_size]],
+            "user_id": user_id,
+            "lane": lane,
+            "note_count": len(note_ids[i:i + batch_size]),
+        }
+        for i in range(0, len(note_ids), batch_size)
+    ]
+    if rows:
+        db.execute(insert(OutboxEvent), rows)
+
+
+def claim_events(db: Session, limit: int, lane: Optional[str] = None) -> List[OutboxEvent]:
+    # kullanıcılar arasında not bazında round robin: event'in sırası, kullanıcının kendinden önceki
+    # event'lerindeki not sayısıdır. SUMMARY_BATCH_SIZE notluk bir import event'i tek notluk event'lere göre
+    # o kadar tur arkada kalır; 50k'lık bir import diğer kullanıcıların notlarını arkasına almaz.
+    # Sıralama sadece lane'in en eski OUTBOX_FAIRNESS_WINDOW event'i üzerinde yapılır (tüm outbox sıralanmaz).
+    # SKIP LOCKED: birden fazla relay aynı event'i almaz
+    window = select(OutboxEvent.id, OutboxEvent.user_id, OutboxEvent.note_count, OutboxEvent.created_at)
+    if lane is not None:
+        window = window.where(OutboxEvent.lane == lane)
+    window = window.order_by(OutboxEvent.created_at, OutboxEvent.id).limit(settings.OUTBOX_FAIRNESS_WINDOW).subquery()
+    notes_before = func.sum(window.c.note_count).over(
+        partition_by=window.c.user_id, order_by=(window.c.created_at, window.c.id)
+    ) - window.c.note_count
+    ranked = select(window.c.id, notes_before.label("turn")).subquery()
+    return list(db.scalars(
+        select(OutboxEvent)
+        .join(ranked, ranked.c.id == OutboxEvent.id)
+        .order_by(ranked.c.turn, OutboxEvent.created_at, OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(of=OutboxEvent, skip_locked=True)
+    ))
+
+
+def delete_events(db: Session, event_ids: List[str]) -> None:
+    db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(event_ids)))
+
+
+def get_backlog(db: Session, lane: Optional[str] = None) -> Tuple[int, Optional[datetime]]:
+    # bekleyen event sayısı ve en eskisinin created_at'i (relay lag için)
+    query = select(func.count(OutboxEvent.id), func.min(OutboxEvent.created_at))
+    if lane is not None:
+        query = query.where(OutboxEvent.lane == lane)
+    count, oldest = db.execute(query).one()
+    return count, oldest
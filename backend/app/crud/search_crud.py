@@ -0,0 +1,43 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, cast, func, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from app.core.search_index import search_document
+from app.core.settings import settings
+from app.models.notes import Note
+
+
+def uses_tsvector(db: Session) -> bool:
+    # Postgres'te notes.search_vector + GIN, diğer DB'lerde in-process index (app/core/search_index.py)
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def text_search_config():
+    return cast(settings.SEARCH_TEXT_CONFIG, REGCONFIG)
+
+
+def search_vector_expression(db: Session, raw_text: Optional[str], summary: Optional[str]):
+    # INSERT / ORM attribute'u için; Postgres değilse None (kolon boş kalır)
+    if not uses_tsvector(db):
+        return None
+    return func.to_tsvector(text_search_config(), search_document(raw_text, summary))
+
+
+def index_notes(db: Session, notes: List[Tuple[str, Optional[str], Optional[str]]]) -> None:
+    # (id, raw_text, summary) -> search_vector, tek executemany UPDATE. commit etmez.
+    # raw_text None ise (stream edilen büyük notlar) sadece summary index'lenir.
+    # updated_at değişmez (onupdate'i bastırılır), index'leme ETag'leri etkilemez.
+    if not notes or not uses_tsvector(db):
+        return
+    table = Note.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            search_vector=func.to_tsvector(text_search_config(), bindparam("b_document")),
+            updated_at=table.c.updated_at,
+        ),
+        [{"b_id": note_id, "b_document": search_document(raw_text, summary)} for note_id, raw_text, summary in notes],
+    )
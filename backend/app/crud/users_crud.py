@@ -1,6 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
-from app.models.users import User
+from app.core.hashing import run_hashing
+from app.core.principal_cache import invalidate_principal
+from app.crud.notes_crud import delete_notes_where
+from app.db.session import run_db
+from app.models.notes import Note
+from app.models.users import Role, User
 from app.schemas.users import UserCreate
 from typing import Optional
 
@@ -16,8 +22,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool: # şifre
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
-def create_user(db: Session, user_in: UserCreate) -> User:
-    hashed_password = get_password_hash(user_in.password)
+def create_user(db: Session, user_in: UserCreate, hashed_password: Optional[str] = None) -> User:
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_in.password)
     db_user = User(
         email=user_in.email,
         password_hash=hashed_password,
@@ -28,8 +35,45 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     db.refresh(db_user)
     return db_user
 
+def update_user_role(db: Session, user: User, role: Role) -> User:
+    user.role = role
+    db.commit()
+    db.refresh(user)
+    # cache'deki eski role ile yetki verilmesin (tüm API process'lerinde)
+    invalidate_principal(user.id)
+    return user
+
+def delete_user(db: Session, user: User) -> None:
+    # notlar stats delta'larıyla aynı transaction'da silinir
+    delete_notes_where(db, Note.user_id == user.id)
+    db.delete(user)
+    db.commit()
+    invalidate_principal(user.id)
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]: # kullanıcının email ve şifresi doğru mu kontrol ediliyor
     user = get_user_by_email(db, email)
     if not user or not verify_password(password, user.password_hash):
         return None
-    return user 
\ No newline at end of file
+    return user
+
+
+# Async variants - API endpoint'leri event loop'u bloklamadan kullanır
+async def get_user_by_email_async(db: Session | AsyncSession, email: str) -> Optional[User]:
+    return await run_db(db, get_user_by_email, email)
+
+# bcrypt hash/verify event loop'u tutmasın diye bounded executor'da çalışır (core/hashing.py)
+async def create_user_async(db: Session | AsyncSession, user_in: UserCreate) -> User:
+    hashed_password = await run_hashing(get_password_hash, user_in.password)
+    return await run_db(db, create_user, user_in, hashed_password)
+
+async def update_user_role_async(db: Session | AsyncSession, user: User, role: Role) -> User:
+    return await run_db(db, update_user_role, user, role)
+
+async def delete_user_async(db: Session | AsyncSession, user: User) -> None:
+    return await run_db(db, delete_user, user)
+
+async def authenticate_user_async(db: Session | AsyncSession, email: str, password: str) -> Optional[User]:
+    user = await get_user_by_email_async(db, email)
+    if not user or not await run_hashing(verify_password, password, user.password_hash):
+        return None
+    return user
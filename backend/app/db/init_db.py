@@ -1,9 +1,13 @@
+import logging
+
 from sqlalchemy.orm import Session
 
 from app.crud.users_crud import get_user_by_email, create_user
 from app.core.settings import settings
 from app.schemas.users import UserCreate, Role
 
+logger = logging.getLogger(__name__)
+
 
 def init_db(db: Session) -> None:
     # Note: Tables should be created via Alembic migrations
@@ -17,13 +21,22 @@ def init_db(db: Session) -> None:
             role=Role.ADMIN
         )
         admin_user = create_user(db, user_in=user_in)
-        print(f"Admin user created: {admin_user.email}")
+        logger.info(f"Admin user created: {admin_user.email}")
     else:
-        print(f"Admin user already exists: {admin_user.email}")
+        logger.info(f"Admin user already exists: {admin_user.email}")
         
-    print("Database initialization completed.")
+    logger.info("Database initialization completed.")
 
 
+def run_init_db() -> None:
+    # tek seferlik başlatma: deploy'da ayrı adım olarak veya INIT_DB_ON_STARTUP ile lifespan'de
+    from app.db.session import SessionLocal
 
+    with SessionLocal() as db:
+        init_db(db)
 
 
+if __name__ == "__main__":
+    # python -m app.db.init_db (alembic upgrade head sonrası, worker'lar başlamadan önce)
+    logging.basicConfig(level=logging.INFO)
+    run_init_db()
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import TimedReplicaAsyncAdaptedQueuePool, TimedReplicaQueuePool, instrument_engine
+from app.core.settings import settings
+from app.db.session import AsyncSessionLocal, SessionLocal, async_session_scope
+
+logger = logging.getLogger(__name__)
+
+# read-your-writes: yazan client'a verilir, süresi dolana kadar okumaları primary'den
+READ_PRIMARY_COOKIE = "read_primary_until"
+# yazma endpoint'lerinin request.state'e koyduğu işaret (login gibi okuma yapan POST'lar pin'lenmez)
+PRIMARY_WRITE_STATE = "primary_write"
+
+# replay edilecek WAL yoksa lag 0 (primary'de yazma olmadığında replay timestamp'i eskir)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+replica_engines = [
+    create_engine(
+        uri,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        **({"poolclass": TimedReplicaQueuePool} if settings.METRICS_ENABLED else {}),
+    )
+    for uri in settings.SQLALCHEMY_REPLICA_URIS
+]
+async_replica_engines = [
+    create_async_engine(
+        uri,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        **({"poolclass": TimedReplicaAsyncAdaptedQueuePool} if settings.METRICS_ENABLED else {}),
+    )
+    for uri in settings.SQLALCHEMY_ASYNC_REPLICA_URIS
+]
+
+if settings.METRICS_ENABLED:
+    for index, replica_engine in enumerate(replica_engines):
+        instrument_engine(replica_engine, f"replica{index}-sync")
+    for index, replica_engine in enumerate(async_replica_engines):
+        instrument_engine(replica_engine.sync_engine, f"replica{index}-async")
+
+
+def read_lag(conn: Connection) -> float:
+    # sadece Postgres streaming replication'da ölçülür (sqlite vb. replica'lar lag'siz kabul edilir)
+    if conn.dialect.name != "postgresql":
+        return 0.0
+    return float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+
+
+class ReplicaRouter:
+    # okuma session'ı için replica seçer: lag'i DB_REPLICA_MAX_LAG_SECONDS altındakiler arasında round robin,
+    # hiçbiri uygun değilse primary. Lag en fazla DB_REPLICA_LAG_CHECK_SECONDS'te bir ölçülür.
+    def __init__(self, count: int, max_lag_seconds: float, check_interval_seconds: float):
+        self.count = count
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lags: List[float] = [0.0] * count  # inf: ulaşılamıyor
+        self.checked_at = float("-inf")
+        self._next = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.lag_fallbacks = 0
+        self.miss_fallbacks = 0
+
+    async def measure(self, index: int) -> float:
+        try:
+            if settings.DB_ASYNC:
+                async with async_replica_engines[index].connect() as conn:
+                    return await conn.run_sync(read_lag)
+
+            def measure_sync() -> float:
+                with replica_engines[index].connect() as conn:
+                    return read_lag(conn)
+
+            return await run_in_threadpool(measure_sync)
+        except Exception as e:
+            logger.warning(f"Replica {index} lag check failed: {e}")
+            return float("inf")
+
+    async def refresh(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # lock beklerken başka bir istek ölçtüyse tekrar ölçülmez
+            if time.monotonic() - self.checked_at < self.check_interval_seconds:
+                return
+            self.lags = list(await asyncio.gather(*(self.measure(index) for index in range(self.count))))
+            self.checked_at = time.monotonic()
+
+    async def choose(self) -> Optional[int]:
+        if not self.count:
+            return None
+        if time.monotonic() - self.checked_at >= self.check_interval_seconds:
+            await self.refresh()
+        healthy = [index for index, lag in enumerate(self.lags) if lag <= self.max_lag_seconds]
+        if not healthy:
+            self.lag_fallbacks += 1
+            return None
+        self._next += 1
+        return healthy[self._next % len(healthy)]
+
+    def get_stats(self) -> dict:
+        finite = [lag for lag in self.lags if lag != float("inf")]
+        return {
+            "replicas": self.count,
+            "healthy": sum(1 for lag in self.lags if lag <= self.max_lag_seconds),
+            "max_lag_seconds": max(finite, default=0.0),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+            "lag_fallbacks": self.lag_fallbacks,
+            "miss_fallbacks": self.miss_fallbacks,
+        }
+
+
+class PrimaryPins:
+    # Authorization header -> primary'den okunacağı son an (process içi; process'ler arası cookie ile).
+    # Entry'ler grace_seconds daha tutulur: bu sürede replica'da bulunamayan satırlar primary'den okunur.
+    def __init__(self, window_seconds: float, grace_seconds: float = 0.0):
+        self.window_seconds = window_seconds
+        self.grace_seconds = grace_seconds
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pin(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until.pop(key, None)
+            self._until[key] = now + self.window_seconds
+            # pencere sabit olduğu için en eski entry en önce biter
+            while self._until and next(iter(self._until.values())) + self.grace_seconds <= now:
+                self._until.popitem(last=False)
+
+    def is_pinned(self, key: str, grace_seconds: float = 0.0) -> bool:
+        until = self._until.get(key)
+        return until is not None and until + grace_seconds > time.monotonic()
+
+
+replica_router = ReplicaRouter(
+    count=len(async_replica_engines),
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.DB_REPLICA_LAG_CHECK_SECONDS,
+)
+primary_pins = PrimaryPins(settings.DB_READ_YOUR_WRITES_SECONDS, grace_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS)
+
+
+def replicas_enabled() -> bool:
+    return replica_router.count > 0
+
+
+def is_pinned_to_primary(request: Request, grace_seconds: float = 0.0) -> bool:
+    # grace_seconds > 0: pencere dolmuş ama client yakın zamanda yazmış (miss fallback için)
+    try:
+        if float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) + grace_seconds > time.time():
+            return True
+    except ValueError:
+        pass
+    authorization = request.headers.get("authorization")
+    return authorization is not None and primary_pins.is_pinned(authorization, grace_seconds)
+
+
+def mark_primary_write(request: Request) -> None:
+    # yazma endpoint'lerine dependency olarak eklenir; yanıt < 400 ise ReadYourWritesMiddleware pin'ler
+    setattr(request.state, PRIMARY_WRITE_STATE, True)
+
+
+class ReadYourWritesMiddleware:
+    # pure ASGI middleware: başarılı yazma isteğinden (mark_primary_write) sonra client
+    # DB_READ_YOUR_WRITES_SECONDS boyunca primary'den okur (token process içinde, cookie diğer process'ler için)
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # request.state bu dict'i sarar (Request.state scope["state"]'i setdefault ile kullanır)
+        state = scope.setdefault("state", {})
+
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+
+        succeeded = False
+
+        async def send_wrapper(message):
+            nonlocal succeeded
+            if message["type"] == "http.response.start" and message["status"] < 400 and state.get(PRIMARY_WRITE_STATE):
+                succeeded = True
+                if authorization is not None:
+                    primary_pins.pin(authorization)
+                window = settings.DB_READ_YOUR_WRITES_SECONDS
+                # cookie grace süresince de gönderilir (miss fallback), değeri primary penceresinin sonu
+                max_age = int(window + primary_pins.grace_seconds) + 1
+                cookie = f"{READ_PRIMARY_COOKIE}={time.time() + window:.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False) and succeeded and authorization is not None:
+                # stream eden yazmalarda (bulk) pencere son chunk'tan itibaren sayılır
+                primary_pins.pin(authorization)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+@asynccontextmanager
+async def read_session_scope(primary: bool = False) -> AsyncIterator[Union[Session, AsyncSession]]:
+    # replica seçilemezse (yok, lag yüksek, read-your-writes) primary session'ı
+    index = None
+    if primary:
+        replica_router.pinned_reads += 1
+    else:
+        index = await replica_router.choose()
+
+    if index is None:
+        replica_router.primary_reads += 1
+        async with async_session_scope() as db:
+            yield db
+    elif settings.DB_ASYNC:
+        replica_router.replica_reads += 1
+        async with AsyncSessionLocal(bind=async_replica_engines[index]) as db:
+            db.info["replica"] = index
+            yield db
+    else:
+        replica_router.replica_reads += 1
+        db = SessionLocal(bind=replica_engines[index], expire_on_commit=False)
+        db.info["replica"] = index
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
+# read-only endpoint'ler için (get_async_db yerine)
+async def get_async_read_db(request: Request):
+    if not replicas_enabled():
+        async with async_session_scope() as db:
+            yield db
+        return
+    async with read_session_scope(primary=is_pinned_to_primary(request)) as db:
+        # miss fallback sadece yakın zamanda yazmış client'ın isteklerinde
+        db.info["primary_fallback"] = is_pinned_to_primary(request, primary_pins.grace_seconds)
+        yield db
+
+
+def is_replica_session(db: Union[Session, AsyncSession]) -> bool:
+    return "replica" in db.info
+
+
+async def with_primary_retry(db: Union[Session, AsyncSession], fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    # replica'da bulunamayan satır koşulsuz primary'den tekrar okunur (ucuz ve seyrek miss'ler için)
+    result = await fn(db, *args, **kwargs)
+    if result is None and is_replica_session(db):
+        replica_router.miss_fallbacks += 1
+        async with async_session_scope() as primary_db:
+            result = await fn(primary_db, *args, **kwargs)
+    return result
+
+
+async def with_primary_fallback(db: Union[Session, AsyncSession], fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    # replica henüz yetişmediyse (client'ın kendi yazdığı kullanıcı / not) bulunamayan satır primary'den
+    # okunur; pin cookie'si olmayan isteklerin 404'leri primary'ye tekrar gitmez
+    if not db.info.get("primary_fallback"):
+        return await fn(db, *args, **kwargs)
+    return await with_primary_retry(db, fn, *args, **kwargs)
@@ -1,14 +1,70 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Union
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
 from app.core.settings import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+# METRICS_ENABLED ise pool checkout süresi ölçülür ve sorgular engine event'leri ile sayılır
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    **({"poolclass": TimedQueuePool} if settings.METRICS_ENABLED else {}),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# database'e bağlanmak için kullanılır
+# psycopg 3 aynı "postgresql+psycopg" URL'i ile async driver'ı da destekler (sqlite: aiosqlite)
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    **({"poolclass": TimedAsyncAdaptedQueuePool} if settings.METRICS_ENABLED else {}),
+)
+# commit sonrası attribute'lar expire edilmez, response serialize edilirken lazy load olmaz
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+
+
+# database'e bağlanmak için kullanılır (worker, init_db - sync)
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+# settings.DB_ASYNC'e göre AsyncSession veya sync Session
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[Union[Session, AsyncSession]]:
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
+# API endpoint'leri için
+async def get_async_db():
+    async with async_session_scope() as db:
+        yield db
+
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[..., Any], *args, **kwargs) -> Any:
+    # fn(sync_session, ...) event loop'u bloklamadan çalıştırılır:
+    # AsyncSession ise async driver üzerinden, sync Session ise threadpool'da
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
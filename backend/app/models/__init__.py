@@ -1,2 +1,5 @@
 from .users import User, Role
-from .notes import Note, Status
\ No newline at end of file
+from .notes import Note, Status
+from .outbox import OutboxEvent
+from .note_bodies import NoteBody
+from .note_stats import NoteStat, NoteStatDelta
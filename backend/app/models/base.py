@@ -1,17 +1,60 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, DateTime, Uuid
 from datetime import datetime
+import os
+import threading
+import time
 import uuid
 from datetime import timezone
 
 Base = declarative_base()
 
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    # RFC 9562 UUIDv7: 48 bit unix ms + 12 bit sayaç (aynı ms içinde artar) + 62 bit random.
+    # Zamana göre sıralı: yeni satırlar B-tree'nin sağ ucuna eklenir (uuid4'teki rastgele page split'ler olmaz)
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms = ms
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x7FF  # üst bit boş: taşmadan önce yer kalır
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # sayaç taştı: bir sonraki ms'ye geçilir (saat geri gitse de sıra korunur)
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        ms, counter = _uuid7_last_ms, _uuid7_counter
+    rand = int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=(ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand)
+
+
+def generate_id() -> str:
+    return str(uuid7())
+
+
+def is_valid_id(value: str) -> bool:
+    # dışarıdan gelen id'ler (path, body, cursor) sorguya girmeden kontrol edilir; Postgres'te uuid
+    # kolonuyla geçersiz bir string karşılaştırmak hata verir
+    try:
+        uuid.UUID(value)
+    except (ValueError, TypeError, AttributeError):
+        return False
+    return True
+
+
 class BaseModel(Base):
     __abstract__ = True
 
-    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    # native uuid (Postgres), uygulamada str olarak taşınır; PK index'i yeterli, ayrı ix_*_id yok
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=generate_id)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     def __repr__(self):
-        return f"<{self.__class__.__name__}(id={self.id})>"
\ No newline at end of file
+        return f"<{self.__class__.__name__}(id={self.id})>"
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, ForeignKey, Uuid
+from .base import Base
+
+
+class NoteBody(Base):
+    # NOTE_BODY_STORAGE=zstd iken note text'i burada sıkıştırılmış tutulur, notes.raw_text boş kalır.
+    # bkz. crud/note_bodies_crud.py
+    __tablename__ = "note_bodies"
+
+    note_id = Column(Uuid(as_uuid=False), ForeignKey('notes.id', ondelete='CASCADE'), primary_key=True)
+    codec = Column(String, nullable=False)
+    raw_size = Column(Integer, nullable=False)  # sıkıştırılmamış text uzunluğu (karakter)
+    data = Column(LargeBinary, nullable=False)
@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, Float, Integer, Uuid, Enum as SQLAlchemyEnum
+from .base import Base, BaseModel
+from .notes import Status
+
+
+class NoteStat(Base):
+    # GET /api/notes/stats sayaçları: (user_id, status) başına not sayısı, notes taranmadan okunur.
+    # Yazma yolları buraya değil note_stat_deltas'a yazar; maintenance process'i delta'ları buraya toplar
+    # ve periyodik olarak notes'tan yeniden sayar. bkz. crud/note_stats_crud.py
+    __tablename__ = "note_stats"
+
+    user_id = Column(Uuid(as_uuid=False), primary_key=True)
+    status = Column(SQLAlchemyEnum(Status, name="status"), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    # COMPLETED satırında notların QUEUED -> COMPLETED süreleri toplamı (updated_at - created_at)
+    completion_seconds = Column(Float, nullable=False, default=0.0)
+
+
+class NoteStatDelta(BaseModel):
+    # not yazan transaction sayaç satırını kilitlemek yerine buraya append eder (hot row / deadlock olmaz)
+    __tablename__ = "note_stat_deltas"
+
+    user_id = Column(Uuid(as_uuid=False), nullable=False)
+    status = Column(SQLAlchemyEnum(Status, name="status"), nullable=False)
+    count = Column(Integer, nullable=False)
+    completion_seconds = Column(Float, nullable=False, default=0.0)
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLAlchemyEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, ForeignKey, Index, Text, Uuid, Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, query_expression, relationship
 from .base import BaseModel
 from enum import Enum
 
@@ -15,10 +16,24 @@ class Status(str, Enum):
 
 class Note(BaseModel):
     __tablename__ = "notes"
+    __table_args__ = (
+        # keyset pagination index'leri (bkz. crud/notes_crud.py)
+        Index("ix_notes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_notes_created_at_id", "created_at", "id"),
+        Index("ix_notes_status_created_at", "status", "created_at"),
+        # full-text search (GET /api/notes/search), sadece Postgres'te kullanılır
+        Index("ix_notes_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     status = Column(SQLAlchemyEnum(Status, name="status"), nullable=False)
     raw_text = Column(String, nullable=False)
     summary = Column(String, nullable=False)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Uuid(as_uuid=False), ForeignKey('users.id'), nullable=False)
+    # raw_text + summary tsvector'ü; not yazılırken / worker summary'yi yazarken doldurulur (bkz. search_crud).
+    # Entity yüklenirken okunmaz. SQLite'ta boş kalır, arama in-process index ile yapılır.
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+
+    # view=summary'de raw_text yerine yüklenen kısaltılmış text (with_expression ile, bkz. notes_crud)
+    excerpt = query_expression()
 
     user = relationship("User", back_populates="notes")
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, JSON, Index, Uuid
+from .base import BaseModel
+
+
+class OutboxEvent(BaseModel):
+    # broker'a gönderilecek task'lar, note ile aynı transaction'da yazılır.
+    # outbox relay (worker/outbox_relay.py) batch'ler halinde broker'a taşır ve siler.
+    # lane + user_id + note_count: relay her lane'de kullanıcılar arasında not bazında round robin yapar
+    # (bkz. outbox_crud.claim_events)
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index("ix_outbox_created_at", "created_at"),
+        # claim_events'in lane başına en eski OUTBOX_FAIRNESS_WINDOW event'i
+        Index("ix_outbox_lane_created_at_id", "lane", "created_at", "id"),
+    )
+
+    task_name = Column(String, nullable=False)
+    args = Column(JSON, nullable=False)
+    user_id = Column(Uuid(as_uuid=False), nullable=True)
+    lane = Column(String, nullable=False, default="default", server_default="default")
+    # event'teki not sayısı (summarize event'inde len(args[0])), round robin sırası buna göre ağırlıklandırılır
+    note_count = Column(Integer, nullable=False, default=1, server_default="1")
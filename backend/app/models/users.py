@@ -16,7 +16,7 @@ class User(BaseModel):
     __tablename__ = "users"
 
     role = Column(SQLAlchemyEnum(Role, name="role"), nullable=False)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, unique=True, index=True)
     password_hash = Column(String, nullable=False)
 
     notes = relationship("Note", back_populates="user")
\ No newline at end of file
@@ -1,16 +1,33 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+from typing_extensions import TypedDict
 from enum import Enum
 
+from app.core.settings import settings
+
 class Status(str, Enum):
     QUEUED = "queued"
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     FAILED = "failed"
 
+class NoteView(str, Enum):
+    FULL = "full"  # raw_text dahil
+    SUMMARY = "summary"  # raw_text yüklenmez, istenirse excerpt döner
+
 class NoteCreate(BaseModel):
-    raw_text: str
+    # worker'ın kabul ettiği en büyük not (SUMMARY_MAX_INPUT_CHARS)
+    raw_text: str = Field(max_length=settings.SUMMARY_MAX_INPUT_CHARS)
+
+class NoteBulkDelete(BaseModel):
+    # verilen filtrelerin hepsine uyan notlar silinir; en az biri zorunlu (endpoint'te kontrol edilir)
+    ids: Optional[List[str]] = Field(None, max_length=settings.BULK_DELETE_MAX_IDS)
+    status: Optional[Status] = None
+    created_before: Optional[datetime] = None  # bundan eski notlar
+
+class NoteBulkDeleteResponse(BaseModel):
+    deleted: int
 
 class NoteResponse(BaseModel):
     id: str
@@ -24,6 +41,50 @@ class NoteResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class NoteSummaryResponse(BaseModel):
+    # view=summary: raw_text yok, excerpt sadece istenirse dolu
+    id: str
+    summary: str
+    status: Status
+    user_id: str
+    created_at: datetime
+    updated_at: datetime
+    excerpt: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+# Liste fast path'i: DB satırları (tuple -> dict) validate edilmeden, precompiled adapter ile
+# direkt JSON bytes'a serialize edilir. Alanlar NoteResponse / NoteSummaryResponse ile aynıdır.
+class NoteRow(TypedDict):
+    id: str
+    raw_text: str
+    summary: str
+    status: str  # DB'den models.notes.Status (str enum) gelir, value'su yazılır
+    user_id: str
+    created_at: datetime
+    updated_at: datetime
+
+class NoteSummaryRow(TypedDict):
+    id: str
+    summary: str
+    status: str
+    user_id: str
+    created_at: datetime
+    updated_at: datetime
+    excerpt: Optional[str]
+
+note_rows_adapter = TypeAdapter(List[NoteRow])
+note_summary_rows_adapter = TypeAdapter(List[NoteSummaryRow])
+
+class NoteStatsResponse(BaseModel):
+    # GET /api/notes/stats - note_stats sayaçlarından, anahtarlar status değerleri
+    total: int
+    by_status: Dict[str, int]
+    by_user: Dict[str, Dict[str, int]]
+    backlog: int  # queued + in_progress
+    avg_completion_seconds: Optional[float] = None  # created_at -> COMPLETED, completed notlar üzerinden
+
 class Note(BaseModel):
     id: str
     raw_text: str
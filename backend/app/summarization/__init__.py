@@ -0,0 +1,26 @@
+import logging
+from typing import List, Optional
+
+from app.core.settings import settings
+from .rule_based import generate_summary
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("rule", "tfidf")
+
+
+def summarize_batch(texts: List[str], engine: Optional[str] = None) -> List[str]:
+    # SUMMARIZER_ENGINE=tfidf: vectorized batch engine (numpy/scipy gerekir)
+    # SUMMARIZER_ENGINE=rule: eski rule-based summarizer, not başına
+    engine = engine or settings.SUMMARIZER_ENGINE
+    if engine == "tfidf":
+        try:
+            from .tfidf import summarize_batch as tfidf_summarize_batch
+        except ImportError as e:
+            logger.warning(f"tfidf summarizer unavailable ({e}), falling back to rule-based")
+        else:
+            return tfidf_summarize_batch(texts, top_k=settings.SUMMARY_TOP_K)
+    return [generate_summary(text) for text in texts]
+
+
+__all__ = ["ENGINES", "generate_summary", "summarize_batch"]
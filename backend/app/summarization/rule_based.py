@@ -0,0 +1,24 @@
+def generate_summary(text: str) -> str:
+    # simple rule-based text summarization
+    # Basic rules for summarization
+    sentences = text.split('.')
+    
+    # empty sentences kaldırılır
+    sentences = [s.strip() for s in sentences if s.strip()]
+    
+    # text kısa ise text döndürülür
+    if len(sentences) <= 2:
+        return text
+    
+    # simple extractive summarization - first and last sentences alınır
+    if len(sentences) <= 5:
+        summary = '. '.join(sentences[:2])
+    else:
+        # longer texts için first 2 and last 1 sentences alınır
+        summary = '. '.join(sentences[:2] + [sentences[-1]])
+    
+    # text kısaltıldıysa ellipsis eklenir
+    if len(summary) < len(text) * 0.7:
+        summary += "..."
+    
+    return summary.strip() + "." if not summary.endswith('.') else summary.strip()
@@ -0,0 +1,139 @@
+import hashlib
+from collections import deque
+from typing import Deque, Iterable, List, Optional
+
+from app.core.settings import settings
+from .rule_based import generate_summary
+
+# generate_summary bu kadar veya daha az cümleli metni özetlemeden döndürür
+SHORT_TEXT_SENTENCES = 2
+
+
+class SentenceCollector:
+    # Metni chunk chunk okur ve sadece summarizer'ın ihtiyaç duyduğu cümleleri tutar:
+    # ilk `head` ve son `tail` cümle, her biri en fazla max_sentence_chars karakter.
+    # Bellek kullanımı not boyutundan bağımsızdır (chunk + aday cümleler).
+    # Cümle ayrımı generate_summary ile aynıdır ('.' ile split, boşlar atlanır).
+    # En fazla 2 cümlelik metinler tam tutulur: generate_summary onları olduğu gibi döndürür.
+    def __init__(self, head: int, tail: int, max_sentence_chars: int):
+        self.head_size = head
+        self.max_sentence_chars = max_sentence_chars
+        self.head: List[str] = []
+        self.tail: Deque[str] = deque(maxlen=tail)
+        self.sentence_count = 0
+        self.total_chars = 0
+        self._current: List[str] = []
+        self._current_chars = 0
+        self._hasher = hashlib.sha256()
+        self._text: Optional[List[str]] = []
+
+    def feed(self, chunk: str) -> None:
+        self.total_chars += len(chunk)
+        self._hasher.update(chunk.encode("utf-8"))
+        if self._text is not None:
+            self._text.append(chunk)
+        self._feed(chunk)
+        if self.sentence_count > SHORT_TEXT_SENTENCES:
+            self._text = None
+
+    def _feed(self, chunk: str) -> None:
+        # ilk parça mevcut cümlenin devamı, son parça yeni cümlenin başı,
+        # aradakiler tam cümledir
+        parts = chunk.split('.')
+        self._append(parts[0])
+        if len(parts) == 1:
+            return
+        self._end_sentence()
+
+        complete = parts[1:-1]
+        i = 0
+        while i < len(complete) and len(self.head) < self.head_size:
+            self._append(complete[i])
+            self._end_sentence()
+            i += 1
+        # head dolduysa sadece sayılır, son `tail` cümle tutulur
+        rest = [part for part in complete[i:] if part.strip()]
+        self.sentence_count += len(rest)
+        for part in rest[-self.tail.maxlen:] if self.tail.maxlen else ():
+            self.tail.append(part[:self.max_sentence_chars].strip())
+
+        self._append(parts[-1])
+
+    def close(self) -> "SentenceCollector":
+        self._end_sentence()
+        if self.sentence_count > SHORT_TEXT_SENTENCES:
+            self._text = None
+        return self
+
+    @property
+    def text(self) -> Optional[str]:
+        # sadece kısa metinlerde (en fazla SHORT_TEXT_SENTENCES cümle) tam metin, diğerlerinde None
+        return ''.join(self._text) if self._text is not None else None
+
+    @property
+    def digest(self) -> str:
+        # summary cache anahtarı için tüm metnin sha256'sı
+        return self._hasher.hexdigest()
+
+    @property
+    def candidates(self) -> List[str]:
+        return self.head + list(self.tail)
+
+    def _append(self, part: str) -> None:
+        room = self.max_sentence_chars - self._current_chars
+        if room > 0 and part:
+            part = part[:room]
+            self._current.append(part)
+            self._current_chars += len(part)
+
+    def _end_sentence(self) -> None:
+        sentence = ''.join(self._current).strip()
+        self._current = []
+        self._current_chars = 0
+        if not sentence:
+            return
+        self.sentence_count += 1
+        if len(self.head) < self.head_size:
+            self.head.append(sentence)
+        else:
+            self.tail.append(sentence)
+
+
+def collect_sentences(chunks: Iterable[str]) -> SentenceCollector:
+    collector = SentenceCollector(
+        head=settings.SUMMARY_STREAM_HEAD_SENTENCES,
+        tail=settings.SUMMARY_STREAM_TAIL_SENTENCES,
+        max_sentence_chars=settings.SUMMARY_STREAM_MAX_SENTENCE_CHARS,
+    )
+    for chunk in chunks:
+        collector.feed(chunk)
+    return collector.close()
+
+
+def summarize_collected(collector: SentenceCollector, engine: Optional[str] = None) -> str:
+    # rule engine: generate_summary ile aynı kural (ilk 2 + son cümle, ellipsis);
+    # tfidf engine: aday cümleler üzerinde çalışır
+    from . import summarize_batch
+
+    engine = engine or settings.SUMMARIZER_ENGINE
+    if collector.text is not None:
+        # kısa / cümlesiz metin: engine'ler tam metinle çalışır (generate_summary metni olduğu gibi döndürür)
+        return summarize_batch([collector.text], engine=engine)[0]
+    candidates = collector.candidates
+    if engine != "rule":
+        return summarize_batch(['. '.join(candidates) + '.'], engine=engine)[0]
+
+    if collector.sentence_count <= 5:
+        summary = '. '.join(candidates[:2])
+    else:
+        summary = '. '.join(candidates[:2] + [candidates[-1]])
+    if len(summary) < collector.total_chars * 0.7:
+        summary += "..."
+    return summary.strip() + "." if not summary.endswith('.') else summary.strip()
+
+
+def summarize_stream(chunks: Iterable[str], engine: Optional[str] = None) -> str:
+    return summarize_collected(collect_sentences(chunks), engine)
+
+
+__all__ = ["SentenceCollector", "collect_sentences", "generate_summary", "summarize_collected", "summarize_stream"]
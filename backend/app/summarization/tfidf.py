@@ -0,0 +1,83 @@
+import re
+from typing import List
+
+import numpy as np
+from scipy import sparse
+
+SENTENCE_RE = re.compile(r"[^.!?]+[.!?]*")
+TOKEN_RE = re.compile(r"\w+")
+
+
+def summarize_batch(texts: List[str], top_k: int = 3) -> List[str]:
+    # Batch extractive summarization: tüm notların cümleleri tek sparse TF-IDF
+    # matrisinde toplanır, her cümle kendi notunun centroid'ine cosine benzerliği
+    # ile puanlanır ve her nottan en yüksek top_k cümle orijinal sırasıyla seçilir.
+    sentences: List[str] = []
+    owners: List[int] = []
+    for note_index, text in enumerate(texts):
+        for match in SENTENCE_RE.finditer(text):
+            sentence = match.group().strip()
+            if sentence:
+                sentences.append(sentence)
+                owners.append(note_index)
+
+    if not sentences:
+        return list(texts)
+
+    # cümle x terim count matrisi (CSR): token'lar tek listede toplanır,
+    # vocabulary np.unique ile tek seferde çıkarılır
+    tokens: List[str] = []
+    lengths: List[int] = []
+    for sentence in sentences:
+        sentence_tokens = TOKEN_RE.findall(sentence.lower())
+        tokens.extend(sentence_tokens)
+        lengths.append(len(sentence_tokens))
+
+    n_sentences = len(sentences)
+    vocabulary, indices = np.unique(np.asarray(tokens, dtype=str), return_inverse=True)
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    counts = sparse.csr_matrix(
+        (np.ones(len(tokens), dtype=np.float32), indices.astype(np.int64).ravel(), indptr),
+        shape=(n_sentences, max(len(vocabulary), 1)),
+    )
+    counts.sum_duplicates()
+
+    # smooth idf + L2 normalize
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n_sentences) / (1 + document_frequency)) + 1
+    tfidf = counts.multiply(idf.astype(np.float32)).tocsr()
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    tfidf = sparse.diags(1 / norms).dot(tfidf).tocsr()
+
+    # not centroid'leri: (not x cümle) ortalama matrisi ile tek çarpım
+    owners_arr = np.asarray(owners, dtype=np.int64)
+    n_notes = len(texts)
+    sentence_counts = np.bincount(owners_arr, minlength=n_notes)
+    averaging = sparse.csr_matrix(
+        (1 / sentence_counts[owners_arr], (owners_arr, np.arange(n_sentences))),
+        shape=(n_notes, n_sentences),
+    )
+    centroids = averaging.dot(tfidf).tocsr()
+    scores = np.asarray(tfidf.multiply(centroids[owners_arr]).sum(axis=1)).ravel()
+
+    # her notun içinde skora göre sıralama, not başına ilk top_k cümle tutulur
+    positions = np.arange(n_sentences)
+    order = np.lexsort((positions, -scores, owners_arr))
+    group_start = np.concatenate(([0], np.cumsum(sentence_counts)[:-1]))
+    rank = np.empty(n_sentences, dtype=np.int64)
+    rank[order] = np.arange(n_sentences) - group_start[owners_arr[order]]
+    selected = np.flatnonzero(rank < top_k)  # pozisyon sırasında, orijinal cümle sırası korunur
+
+    summaries: List[List[str]] = [[] for _ in range(n_notes)]
+    for i in selected.tolist():
+        summaries[owners[i]].append(sentences[i])
+
+    results = []
+    for text, count, parts in zip(texts, sentence_counts.tolist(), summaries):
+        # kısa notlar olduğu gibi döner (rule-based ile aynı)
+        if count <= top_k:
+            results.append(text)
+        else:
+            results.append(" ".join(parts))
+    return results
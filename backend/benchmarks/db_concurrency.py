@@ -0,0 +1,74 @@
+"""Concurrent load against a running API, to compare DB_ASYNC=true/false.
+
+Usage:
+    DB_ASYNC=false uvicorn main:app --port 8000   # sync Session (threadpool)
+    DB_ASYNC=true  uvicorn main:app --port 8000   # AsyncSession (psycopg async)
+    python -m benchmarks.db_concurrency --url http://localhost:8000 --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    resp = await client.post("/api/auth/login", data={"username": email, "password": password})
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def run(url: str, email: str, password: str, concurrency: int, total: int, path: str) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        token = await login(client, email, password)
+        headers = {"Authorization": f"Bearer {token}"}
+        latencies = []
+        errors = 0
+        remaining = total
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                resp = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if resp.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@example.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", default="/api/notes/?limit=50")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.email, args.password, args.concurrency, args.requests, args.path))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Redis memory: summarization task'ları sonuç saklamadan (şimdiki ayar) vs Redis result backend ile (eski ayar).
+
+Worker bu process'te bir thread'de çalışır (celery.contrib.testing), broker --redis-url, DB SQLite
+(veya --database-url). --notes QUEUED not oluşturulur, task'lar gönderilir ve hepsi bitince Redis'in
+used_memory'si ve celery-task-meta-* key'leri ölçülür. --legacy-results eski ayarı (result backend +
+task_track_started, summary'ler result_expires=3600 boyunca Redis'te) geri açar.
+
+Usage:
+    python -m benchmarks.redis_memory --notes 5000
+    python -m benchmarks.redis_memory --notes 5000 --legacy-results
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "worker")
+RESULT_KEY_PATTERN = "celery-task-meta-*"
+
+
+def configure_environment(args) -> None:
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='redis-memory-'), 'bench.db')}"
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "BROKER_URL": args.redis_url,
+        "CELERY_RESULT_BACKEND": args.redis_url if args.legacy_results else "",
+        "SUMMARY_CACHE_ENABLED": "false",
+        "NOTE_EVENTS_ENABLED": "false",
+        "SUMMARY_SIMULATED_LATENCY_SECONDS": "0",
+        "WORKER_METRICS_PORT": "0",
+        "DB_POOL_SIZE": str(max(args.concurrency, 10)),
+    })
+
+
+def redis_snapshot(client) -> dict:
+    # sonuç key'leri SCAN ile sayılır (KEYS production Redis'i bloklar)
+    keys = 0
+    key_bytes = 0
+    for key in client.scan_iter(match=RESULT_KEY_PATTERN, count=1000):
+        keys += 1
+        key_bytes += client.memory_usage(key) or 0
+    return {"used_memory": client.info("memory")["used_memory"], "result_keys": keys, "result_key_bytes": key_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--task", choices=["note", "batch"], default="note", help="worker.summarize_note / summarize_notes_batch")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--legacy-results", action="store_true", help="Redis result backend + task_track_started (eski ayar)")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    configure_environment(args)
+    sys.path.insert(0, BACKEND_DIR)
+    import redis
+    from celery.contrib.testing.worker import start_worker
+
+    from benchmarks.load_suite import load_module, prepare_database
+    from benchmarks.worker_throughput import count_completed, create_queued_notes
+
+    prepare_database()
+    load_module("bench_worker", os.path.join(WORKER_DIR, "main.py"))
+    from app.core.celery_app import celery_app
+    from app.core.settings import settings
+
+    if args.legacy_results:
+        celery_app.conf.task_ignore_result = False
+        celery_app.conf.task_track_started = True
+
+    client = redis.Redis.from_url(args.redis_url)
+    note_ids = create_queued_notes(args.notes)
+    if args.task == "note":
+        messages = [("worker.summarize_note", [note_id]) for note_id in note_ids]
+    else:
+        batch_size = settings.SUMMARY_BATCH_SIZE
+        messages = [("worker.summarize_notes_batch", [note_ids[i:i + batch_size]]) for i in range(0, len(note_ids), batch_size)]
+
+    before = redis_snapshot(client)
+    with start_worker(celery_app, pool="threads", concurrency=args.concurrency, perform_ping_check=False, shutdown_timeout=120):
+        started = time.perf_counter()
+        for task_name, task_args in messages:
+            celery_app.send_task(task_name, args=task_args)
+        completed = 0
+        while time.perf_counter() - started < args.timeout:
+            completed = count_completed(note_ids)
+            if completed == len(note_ids):
+                break
+            time.sleep(0.1)
+        elapsed = time.perf_counter() - started
+    after = redis_snapshot(client)
+
+    print(json.dumps({
+        "task": args.task,
+        "legacy_results": args.legacy_results,
+        "tasks": len(messages),
+        "notes": len(note_ids),
+        "completed": completed,
+        "seconds": round(elapsed, 3),
+        "used_memory_before": before["used_memory"],
+        "used_memory_after": after["used_memory"],
+        "used_memory_delta": after["used_memory"] - before["used_memory"],
+        "result_keys_added": after["result_keys"] - before["result_keys"],
+        "result_key_bytes_added": after["result_key_bytes"] - before["result_key_bytes"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
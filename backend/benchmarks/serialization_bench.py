@@ -0,0 +1,105 @@
+"""Note list serialization: current path (ORM + response_model) vs fast path (row tuples + TypeAdapter).
+
+Current: select(Note) -> ORM objects -> response_model validation (from_attributes) -> JSONResponse.
+Fast:    select(columns) -> dicts -> note_rows_adapter.dump_json (validation yok) -> RawJSONResponse.
+
+Usage:
+    python -m benchmarks.serialization_bench --rows 10 1000 50000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.crud.notes_crud import NOTE_COLUMNS
+from app.models.base import Base, generate_id
+from app.models.notes import Note, Status
+from app.models.users import Role, User
+from app.schemas.notes import NoteResponse, note_rows_adapter
+
+
+def make_db(n_rows: int, text_chars: int) -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    user_id = generate_id()
+    db.add(User(id=user_id, email="bench@example.com", password_hash="x", role=Role.AGENT))
+    db.commit()
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": generate_id(),
+            "raw_text": "".join(rng.choices("abcdefgh ", k=text_chars)),
+            "summary": "summary " * 10,
+            "status": Status.COMPLETED,
+            "user_id": user_id,
+            "created_at": now - timedelta(seconds=i),
+            "updated_at": now - timedelta(seconds=i),
+        }
+        for i in range(n_rows)
+    ]
+    db.execute(insert(Note), rows)
+    db.commit()
+    return db
+
+
+def current_path(db: Session, n_rows: int, response_class) -> bytes:
+    field = create_model_field(name="Response", type_=List[NoteResponse], mode="serialization")
+    notes = list(db.scalars(select(Note).order_by(Note.created_at.desc()).limit(n_rows)))
+    content = asyncio.run(serialize_response(field=field, response_content=notes, is_coroutine=True))
+    return response_class(content).body
+
+
+def fast_path(db: Session, n_rows: int) -> bytes:
+    rows = [row._asdict() for row in db.execute(select(*NOTE_COLUMNS).order_by(Note.created_at.desc()).limit(n_rows))]
+    return note_rows_adapter.dump_json(rows)
+
+
+def timed(fn, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1000, 50000])
+    parser.add_argument("--text-chars", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        db = make_db(n_rows, args.text_chars)
+        # expire_all: her turda ORM objeleri yeniden yüklenir (identity map'ten gelmesin)
+        current, current_body = timed(lambda: (db.expire_all(), current_path(db, n_rows, JSONResponse))[1], args.repeat)
+        current_orjson, _ = timed(lambda: (db.expire_all(), current_path(db, n_rows, ORJSONResponse))[1], args.repeat)
+        fast, fast_body = timed(lambda: fast_path(db, n_rows), args.repeat)
+        results.append({
+            "rows": n_rows,
+            "current_ms": round(current * 1000, 3),
+            "current_orjson_ms": round(current_orjson * 1000, 3),
+            "fast_ms": round(fast * 1000, 3),
+            "speedup": round(current / fast, 2),
+            "same_payload": json.loads(current_body) == json.loads(fast_body),
+        })
+        db.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
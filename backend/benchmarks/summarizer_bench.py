@@ -0,0 +1,65 @@
+"""Throughput of the rule-based and tfidf summarizer engines on synthetic notes.
+
+Usage:
+    python -m benchmarks.summarizer_bench --sizes 100 1000 10000 --sentences 4 40
+"""
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from app.summarization import summarize_batch
+
+WORDS = (
+    "customer called about invoice payment delayed order shipment refund account "
+    "password reset login error agent escalated ticket resolved pending follow up "
+    "contract renewal discount pricing support issue network outage device replaced"
+).split()
+
+
+def make_corpus(n_notes: int, min_sentences: int, max_sentences: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    notes = []
+    for _ in range(n_notes):
+        sentences = [
+            " ".join(rng.choices(WORDS, k=rng.randint(5, 20))).capitalize() + "."
+            for _ in range(rng.randint(min_sentences, max_sentences))
+        ]
+        notes.append(" ".join(sentences))
+    return notes
+
+
+def bench(engine: str, corpus: List[str], repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        summarize_batch(corpus, engine=engine)
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        "engine": engine,
+        "notes": len(corpus),
+        "notes_per_sec": round(len(corpus) / best, 1),
+        "per_note_latency_ms": round(best / len(corpus) * 1000, 4),
+        "batch_seconds": round(best, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--sentences", type=int, nargs=2, default=[4, 40], metavar=("MIN", "MAX"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        corpus = make_corpus(size, *args.sentences)
+        for engine in ("rule", "tfidf"):
+            results.append(bench(engine, corpus, args.repeat))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
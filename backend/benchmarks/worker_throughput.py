@@ -0,0 +1,148 @@
+"""Worker notes/sec per execution mode: eski kurulum (tek task, --concurrency=1) vs threads pool.
+
+Worker bu process'te bir thread'de çalışır (celery.contrib.testing), broker memory://, DB SQLite
+(veya --database-url). Her mod için --notes QUEUED not oluşturulur, task'lar gönderilir ve hepsi
+COMPLETED olana kadar geçen süre ölçülür. AI gecikmesi --simulated-latency ile verilir (prod: 5s);
+I/O-bound olduğu için threads pool'da notes/sec ~ concurrency / latency olmalı.
+
+memory:// transport'ta worker sync loop ile çalışır; acks_late + prefetch 1'de ack'ten sonraki mesaj
+~1.5s gecikmeyle alınır (Redis'te async loop'ta bu yok). Bu yüzden default --prefetch-multiplier 4'tür.
+
+Usage:
+    python -m benchmarks.worker_throughput --modes solo:1 threads:8 threads:32 --notes 64
+    python -m benchmarks.worker_throughput --task batch --modes solo:1 threads:4 --notes 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "worker")
+
+
+def configure_environment(args) -> None:
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='worker-bench-'), 'bench.db')}"
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "BROKER_URL": "memory://",
+        "SUMMARY_CACHE_ENABLED": "false",
+        "NOTE_EVENTS_ENABLED": "false",
+        "SUMMARY_SIMULATED_LATENCY_SECONDS": str(args.simulated_latency),
+        "WORKER_METRICS_PORT": "0",
+        "SUMMARY_CPU_EXECUTOR": args.cpu_executor,
+        "WORKER_PREFETCH_MULTIPLIER": str(args.prefetch_multiplier),
+        # threads pool'da her task bir bağlantı tutar
+        "DB_POOL_SIZE": str(max(args.max_concurrency, 10)),
+    })
+
+
+def create_queued_notes(n_notes: int) -> list:
+    from sqlalchemy import insert
+
+    from app.db.session import SessionLocal
+    from app.models.base import generate_id
+    from app.models.notes import Note, Status
+    from app.models.users import Role, User
+
+    text = "Customer called about a delayed order. The tracking number was resent. Follow up tomorrow if not delivered. " * 3
+    with SessionLocal() as db:
+        user_id = generate_id()
+        db.add(User(id=user_id, email=f"{user_id}@bench.example.com", password_hash="x", role=Role.AGENT))
+        rows = [{"id": generate_id(), "raw_text": text, "summary": "", "status": Status.QUEUED, "user_id": user_id} for _ in range(n_notes)]
+        db.execute(insert(Note), rows)
+        db.commit()
+    return [row["id"] for row in rows]
+
+
+def count_completed(note_ids: list) -> int:
+    from sqlalchemy import func, select
+
+    from app.db.session import SessionLocal
+    from app.models.notes import Note, Status
+
+    with SessionLocal() as db:
+        return db.execute(
+            select(func.count()).select_from(Note).where(Note.id.in_(note_ids), Note.status == Status.COMPLETED)
+        ).scalar_one()
+
+
+def run_mode(pool: str, concurrency: int, args) -> dict:
+    from celery.contrib.testing.worker import start_worker
+
+    from app.core.celery_app import celery_app
+    from app.core.settings import settings
+
+    note_ids = create_queued_notes(args.notes)
+    if args.task == "note":
+        messages = [("worker.summarize_note", [note_id]) for note_id in note_ids]
+    else:
+        batch_size = settings.SUMMARY_BATCH_SIZE
+        messages = [("worker.summarize_notes_batch", [note_ids[i:i + batch_size]]) for i in range(0, len(note_ids), batch_size)]
+
+    with start_worker(celery_app, pool=pool, concurrency=concurrency, perform_ping_check=False, shutdown_timeout=120):
+        started = time.perf_counter()
+        for task_name, task_args in messages:
+            celery_app.send_task(task_name, args=task_args)
+        completed = 0
+        while time.perf_counter() - started < args.timeout:
+            completed = count_completed(note_ids)
+            if completed == len(note_ids):
+                break
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "pool": pool,
+        "concurrency": concurrency,
+        "tasks": len(messages),
+        "notes": len(note_ids),
+        "completed": completed,
+        "seconds": round(elapsed, 3),
+        "notes_per_second": round(completed / elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["solo:1", "threads:8", "threads:32"], help="pool:concurrency")
+    parser.add_argument("--task", choices=["note", "batch"], default="note", help="worker.summarize_note / summarize_notes_batch")
+    parser.add_argument("--notes", type=int, default=64)
+    parser.add_argument("--simulated-latency", type=float, default=0.5)
+    parser.add_argument("--prefetch-multiplier", type=int, default=4)
+    parser.add_argument("--cpu-executor", choices=["inline", "process"], default="inline")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+    modes = [(mode.split(":")[0], int(mode.split(":")[1])) for mode in args.modes]
+    args.max_concurrency = max(concurrency for _, concurrency in modes)
+
+    configure_environment(args)
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks.load_suite import load_module, prepare_database
+
+    prepare_database()
+    load_module("bench_worker", os.path.join(WORKER_DIR, "main.py"))
+    # memory transport'un 1s polling'i ölçümü bozmasın
+    from app.core.celery_app import celery_app
+
+    celery_app.conf.broker_transport_options = {"polling_interval": 0.01}
+
+    results = [run_mode(pool, concurrency, args) for pool, concurrency in modes]
+    baseline = results[0]["notes_per_second"]
+    for result in results:
+        result["speedup"] = round(result["notes_per_second"] / baseline, 2) if baseline else None
+    print(json.dumps({
+        "task": args.task,
+        "simulated_latency_seconds": args.simulated_latency,
+        "cpu_executor": args.cpu_executor,
+        "prefetch_multiplier": args.prefetch_multiplier,
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
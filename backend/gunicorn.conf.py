@@ -0,0 +1,42 @@
+# Production: gunicorn -c gunicorn.conf.py main:app
+# Bootstrap (alembic upgrade head + python -m app.db.init_db) deploy'da bir kez, bundan önce çalışır.
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# prometheus_client import edilmeden önce (preload master'da app'i import eder)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-api")
+multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+# önceki run'ın metrik dosyaları temizlenir
+shutil.rmtree(multiproc_dir, ignore_errors=True)
+os.makedirs(multiproc_dir, exist_ok=True)
+
+from app.core.settings import settings  # noqa: E402
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+workers = settings.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+# app master'da bir kez import edilir, worker'lar fork ile kopyalar (import maliyeti worker başına ödenmez)
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+
+def post_fork(server, worker):
+    # master'da açılmış bağlantı varsa worker'lar paylaşmaz, her worker kendi pool'unu açar
+    from app.db.replicas import async_replica_engines, replica_engines
+    from app.db.session import async_engine, engine
+
+    for sync_engine in [engine, *replica_engines]:
+        sync_engine.dispose(close=False)
+    for pooled_engine in [async_engine, *async_replica_engines]:
+        pooled_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
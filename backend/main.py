@@ -1,22 +1,79 @@
+import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 
-import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 # Add the parent directory to Python path for local development
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.api import router
+from app.api.metrics import setup_metrics
 from app.core.settings import settings
 
+logger = logging.getLogger(__name__)
+
+
+def initialize_database() -> None:
+    # Initialize database - make it optional
+    try:
+        from app.db.init_db import run_init_db
+
+        run_init_db()
+        logger.info("Database initialized successfully")
+    except Exception as e:
+        logger.warning(f"Could not initialize database: {e}")
+        logger.warning("Application will start without database initialization")
+        logger.warning("Make sure PostgreSQL is running and accessible")
+
+
+async def warm_up_database() -> None:
+    # pool'da ilk bağlantı trafik gelmeden açılır, ilk istek connect maliyetini ödemez
+    from sqlalchemy import text
+
+    from app.db.session import async_session_scope, run_db
+
+    try:
+        async with async_session_scope() as db:
+            await run_db(db, lambda session: session.execute(text("SELECT 1")))
+    except Exception as e:
+        logger.warning(f"Database warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # import sırasında değil, her worker process'i trafik almadan önce bir kez çalışır.
+    # Production'da (INIT_DB_ON_STARTUP=false) admin oluşturma deploy'daki bootstrap adımındadır.
+    if settings.INIT_DB_ON_STARTUP:
+        await run_in_threadpool(initialize_database)
+    await warm_up_database()
+    # diğer process'lerdeki role değişikliği / kullanıcı silme principal cache'ten düşürülür
+    from app.core.principal_cache import principal_invalidation_listener
+
+    principal_invalidation_listener.start()
+    yield
+    # password hashing executor durdurulur, note event subscriber'ı (SSE/WebSocket) kapatılır
+    from app.core.hashing import shutdown_executor
+    from app.core.note_events import note_event_hub
+
+    shutdown_executor()
+    await note_event_hub.close()
+    await principal_invalidation_listener.close()
+
+
 def create_app() -> FastAPI:
     # app and router creation
     app = FastAPI(
         title="Proksi Interview Project API",
         description="A FastAPI application for managing users and notes",
-        version="1.0.0"
+        version="1.0.0",
+        # response_model'den gelen veri orjson ile encode edilir (stdlib json yerine)
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
     )
     
     # Add CORS middleware
@@ -26,21 +83,23 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
     app.include_router(router)
+
+    # read replica varsa: yazma isteğinden sonra client'ın okumaları bir süre primary'den (read-your-writes)
+    if settings.SQLALCHEMY_REPLICA_URIS:
+        from app.db.replicas import ReadYourWritesMiddleware
+
+        app.add_middleware(ReadYourWritesMiddleware)
+
+    # readiness probe - DB'ye gitmez, process trafik almaya hazır mı
+    @app.get("/health", include_in_schema=False)
+    async def health():
+        return {"status": "ok"}
     
-    # Initialize database - make it optional
-    try:
-        from app.db.session import get_db
-        from app.db.init_db import init_db
-        
-        db = next(get_db())
-        init_db(db)
-        print("Database initialized successfully")
-    except Exception as e:
-        print(f"Warning: Could not initialize database: {e}")
-        print("Application will start without database initialization")
-        print("Make sure PostgreSQL is running and accessible")
+    # Prometheus /metrics + route latency / DB sorgu middleware'i
+    setup_metrics(app)
 
     return app
 
@@ -49,4 +108,7 @@ app = create_app()
 
 
 if __name__ == "__main__":
-    uvicorn.run(app="main:app", host="0.0.0.0", port=8000, reload=True, workers=1)
\ No newline at end of file
+    # local geliştirme; WORKERS > 1 ise reload kapalı. Production: gunicorn -c gunicorn.conf.py main:app
+    import uvicorn
+
+    uvicorn.run(app="main:app", host="0.0.0.0", port=8000, reload=settings.WORKERS == 1, workers=settings.WORKERS)
\ No newline at end of file
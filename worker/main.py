@@ -1,8 +1,17 @@
 import sys
 import os
 import logging
+import multiprocessing
+import threading
 import time
-from typing import Optional
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+# prefork child process'lerinin metrikleri için (bkz. app/core/metrics.py), import'lardan önce olmalı
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
 
 # Add the backend directory to Python path
 backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../backend')
@@ -10,14 +19,101 @@ sys.path.insert(0, backend_path)
 
 # Backend imports (backend. prefix olmadan)
 from app.core.celery_app import celery_app
+from app.core.metrics import (
+    SUMMARY_QUEUE_WAIT,
+    WORKER_NOTES,
+    WORKER_TASK_DURATION,
+    WORKER_TASK_QUEUE_WAIT,
+    WORKER_TASK_RETRIES,
+    start_metrics_server,
+)
+from app.core.note_events import note_event, publish_note_events
+from app.core.settings import settings
+from app.core.summary_cache import summary_cache
+from app.crud.note_bodies_crud import iter_decompressed, load_note_bodies, note_text_length
+from app.crud.note_stats_crud import completion_seconds, record_stat_changes, status_change
+from app.crud.outbox_crud import summary_lane
+from app.crud.search_crud import index_notes, search_vector_expression
 from app.db.session import get_db
+from app.models.note_bodies import NoteBody
 from app.models.notes import Note, Status
+from app.summarization import summarize_batch
+from app.summarization.streaming import collect_sentences, summarize_collected
+from celery.signals import task_postrun, task_prerun, task_retry, worker_init
+from sqlalchemy import case, func, select, update
 from sqlalchemy.orm import Session
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# AI özetleme gecikmesi (stub) - batch başına bir kez beklenir
+SIMULATED_LATENCY_SECONDS = settings.SUMMARY_SIMULATED_LATENCY_SECONDS
+
+
+# --- metrics: task süresi, kuyruk bekleme süresi (publish -> start) ve retry'lar ---
+
+@worker_init.connect
+def on_worker_init(**kwargs):
+    start_metrics_server(settings.WORKER_METRICS_PORT)
+    # threads pool'da her task kendi DB bağlantısını kullanır, pool'da yer yoksa task'lar bağlantı bekler
+    if settings.WORKER_POOL == "threads" and settings.WORKER_CONCURRENCY > settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW:
+        logger.warning(
+            f"WORKER_CONCURRENCY={settings.WORKER_CONCURRENCY} exceeds DB pool capacity "
+            f"({settings.DB_POOL_SIZE} + {settings.DB_MAX_OVERFLOW}), tasks will wait for connections"
+        )
+
+
+@task_prerun.connect
+def on_task_prerun(task=None, **kwargs):
+    task.request.metrics_started_at = time.perf_counter()
+    # outbox relay publish anını enqueued_at header'ında gönderir
+    enqueued_at = getattr(task.request, "enqueued_at", None)
+    if enqueued_at:
+        queue = (getattr(task.request, "delivery_info", None) or {}).get("routing_key") or "unknown"
+        WORKER_TASK_QUEUE_WAIT.labels(task.name, queue).observe(max(time.time() - enqueued_at, 0))
+
+
+@task_postrun.connect
+def on_task_postrun(task=None, state=None, **kwargs):
+    started_at = getattr(task.request, "metrics_started_at", None)
+    if started_at is not None:
+        WORKER_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started_at)
+
+
+@task_retry.connect
+def on_task_retry(sender=None, **kwargs):
+    WORKER_TASK_RETRIES.labels(sender.name).inc()
+
+
+# --- CPU-bound summarization: SUMMARY_CPU_EXECUTOR=process ise ayrı process pool'da ---
+
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+_cpu_executor_lock = threading.Lock()
+
+
+def get_cpu_executor() -> Optional[ProcessPoolExecutor]:
+    global _cpu_executor
+    if settings.SUMMARY_CPU_EXECUTOR != "process":
+        return None
+    # prefork child'ları daemon process'tir, child process açamaz - orada inline çalışılır
+    if multiprocessing.current_process().daemon:
+        return None
+    with _cpu_executor_lock:
+        if _cpu_executor is None:
+            # spawn: thread'li process'te fork edilmez
+            _cpu_executor = ProcessPoolExecutor(
+                max_workers=settings.SUMMARY_CPU_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _cpu_executor
+
+
+def summarize_texts(texts: List[str]) -> List[str]:
+    executor = get_cpu_executor()
+    if executor is None:
+        return summarize_batch(texts)
+    return executor.submit(summarize_batch, texts).result()
+
 
 def get_db_session() -> Session:
     # database session'ı alınır
@@ -25,53 +121,118 @@ def get_db_session() -> Session:
 
 
 @celery_app.task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60}, name='worker.summarize_note')
-def summarize_note(self, note_id: str) -> Optional[str]:
+def summarize_note(self, note_id: str) -> None:
     # note'ın id'si alınır
     logger.info(f"Starting summarization for note {note_id}")
+    claimed = False
     
     try:
         # database session'ı alınır
         db = get_db_session()
         
-        # note'ın id'si alınır
-        note = db.query(Note).filter(Note.id == note_id).first()
-        if not note:
+        # sadece gereken kolonlar okunur: text'in boyutu önce kontrol edilir, büyük notların text'i hiç
+        # yüklenmez (SUMMARY_STREAM_THRESHOLD_CHARS üstü NULL döner, batch task'ındaki gibi stream edilir)
+        text_length = note_text_length()
+        compressed = select(NoteBody.note_id).where(NoteBody.note_id == Note.id).exists()
+        current = db.execute(
+            select(
+                Note.user_id,
+                Note.status,
+                Note.created_at,
+                text_length.label("length"),
+                case((text_length <= settings.SUMMARY_STREAM_THRESHOLD_CHARS, Note.raw_text), else_=None).label("raw_text"),
+                compressed.label("compressed"),
+            ).where(Note.id == note_id)
+        ).one_or_none()
+        if current is None:
             logger.error(f"Note {note_id} not found")
-            return None
+            return
+        # eski summarize_note mesajları: not outbox üzerinden batch task'ına da gitmiş olabilir (bd6eef757f33),
+        # sadece hâlâ QUEUED olan not alınır - aynı not iki kez özetlenmez, stats delta'ları iki kez yazılmaz
+        queued = (Note.id == note_id, Note.status == Status.QUEUED)
+        length = current.length
+        if length > settings.SUMMARY_MAX_INPUT_CHARS:
+            logger.error(f"Note {note_id} is too large to summarize ({length} chars)")
+            if db.execute(update(Note).where(*queued).values(status=Status.FAILED).returning(Note.id)).first():
+                record_stat_changes(db, status_change(current.user_id, Status.QUEUED, Status.FAILED))
+                db.commit()
+                publish_note_events([note_event(note_id, current.user_id, Status.FAILED)])
+                WORKER_NOTES.labels(Status.FAILED.value).inc()
+            return
         
-        # status'u IN_PROGRESS'e güncellenir
-        note.status = Status.IN_PROGRESS
+        # koşullu claim: UPDATE ... WHERE status = QUEUED RETURNING (note stats sayaçları aynı transaction'da)
+        now = datetime.now(timezone.utc)
+        if db.execute(update(Note).where(*queued).values(status=Status.IN_PROGRESS, updated_at=now).returning(Note.id)).first() is None:
+            db.rollback()
+            logger.info(f"Note {note_id} is not queued ({current.status.value}), skipping")
+            return
+        claimed = True
+        record_stat_changes(db, status_change(current.user_id, Status.QUEUED, Status.IN_PROGRESS))
         db.commit()
+        publish_note_events([note_event(note_id, current.user_id, Status.IN_PROGRESS, now)])
         logger.info(f"Updated note {note_id} status to IN_PROGRESS")
         
-        # 5 saniye beklenir
-        time.sleep(5)
-        
-        # rule-based summarization (stub)
-        raw_text = note.raw_text
-        summary = generate_summary(raw_text)
+        if current.raw_text is not None:
+            # sıkıştırılmış notlarda raw_text boştur, text note_bodies'den açılır
+            raw_text = load_note_bodies(db, [note_id]).get(note_id, "") if current.compressed else current.raw_text
+            summary = summary_cache.get(raw_text)
+            if summary is None:
+                # 5 saniye beklenir
+                time.sleep(SIMULATED_LATENCY_SECONDS)
+                
+                # SUMMARIZER_ENGINE'e göre (rule-based veya tfidf)
+                summary = summarize_texts([raw_text])[0]
+                summary_cache.set(raw_text, summary)
+        else:
+            # büyük not stream edilir: sadece aday cümleler ve sha256 digest tutulur, search'te sadece summary
+            raw_text = None
+            collector = collect_sentences(iter_note_text(db, note_id, length, current.compressed))
+            db.commit()
+            key = summary_cache.key_for_digest(collector.digest)
+            summary = summary_cache.get_many_by_key([key])[0]
+            if summary is None:
+                time.sleep(SIMULATED_LATENCY_SECONDS)
+                summary = summarize_collected(collector)
+                summary_cache.set_many_by_key({key: summary})
         
-        # note'a summary eklenir
-        note.summary = summary
-        note.status = Status.COMPLETED
+        # note'a summary eklenir, full-text search vector'ü aynı UPDATE'te
+        now = datetime.now(timezone.utc)
+        values = {"summary": summary, "status": Status.COMPLETED, "updated_at": now}
+        search_vector = search_vector_expression(db, raw_text, summary)
+        if search_vector is not None:
+            values["search_vector"] = search_vector
+        db.execute(update(Note).where(Note.id == note_id).values(**values))
+        seconds = completion_seconds(current.created_at, now)
+        record_stat_changes(db, status_change(current.user_id, Status.IN_PROGRESS, Status.COMPLETED, seconds))
         db.commit()
+        publish_note_events([note_event(note_id, current.user_id, Status.COMPLETED, now)])
+        WORKER_NOTES.labels(Status.COMPLETED.value).inc()
         
         logger.info(f"Successfully summarized note {note_id}")
-        return summary
         
     except Exception as exc:
         logger.error(f"Error summarizing note {note_id}: {str(exc)}")
         
-        # status'u FAILED'e güncellenir
-        try:
-            db = get_db_session()
-            note = db.query(Note).filter(Note.id == note_id).first()
-            if note:
-                note.status = Status.FAILED
-                db.commit()
-                logger.info(f"Updated note {note_id} status to FAILED")
-        except Exception as db_exc:
-            logger.error(f"Failed to update note status: {str(db_exc)}")
+        # bu task'ın claim ettiği not retry hakkı varsa tekrar QUEUED (retry'daki koşullu claim alabilsin),
+        # son denemede FAILED yapılır. Claim'den önceki hatalarda not zaten QUEUED'dır
+        if claimed:
+            new_status = Status.QUEUED if self.request.retries < self.max_retries else Status.FAILED
+            try:
+                db = get_db_session()
+                now = datetime.now(timezone.utc)
+                note = db.execute(
+                    update(Note)
+                    .where(Note.id == note_id, Note.status == Status.IN_PROGRESS)
+                    .values(status=new_status, updated_at=now)
+                    .returning(Note.user_id)
+                ).one_or_none()
+                if note:
+                    record_stat_changes(db, status_change(note.user_id, Status.IN_PROGRESS, new_status))
+                    db.commit()
+                    publish_note_events([note_event(note_id, note.user_id, new_status, now)])
+                    logger.info(f"Updated note {note_id} status to {new_status.value}")
+            except Exception as db_exc:
+                logger.error(f"Failed to update note status: {str(db_exc)}")
         
         # Celery retry mekanizması için yeniden fırlatılır
         raise self.retry(exc=exc)
@@ -84,40 +245,206 @@ def summarize_note(self, note_id: str) -> Optional[str]:
             pass
 
 
-def generate_summary(text: str) -> str:
-    # simple rule-based text summarization
-    # Basic rules for summarization
-    sentences = text.split('.')
-    
-    # empty sentences kaldırılır
-    sentences = [s.strip() for s in sentences if s.strip()]
-    
-    # text kısa ise text döndürülür
-    if len(sentences) <= 2:
-        return text
-    
-    # simple extractive summarization - first and last sentences alınır
-    if len(sentences) <= 5:
-        summary = '. '.join(sentences[:2])
-    else:
-        # longer texts için first 2 and last 1 sentences alınır
-        summary = '. '.join(sentences[:2] + [sentences[-1]])
-    
-    # text kısaltıldıysa ellipsis eklenir
-    if len(summary) < len(text) * 0.7:
-        summary += "..."
-    
-    return summary.strip() + "." if not summary.endswith('.') else summary.strip()
+def summarize_each(texts: List[str]) -> List[Optional[str]]:
+    # önce tek vectorized geçiş; hata verirse metinler tek tek özetlenir, özetlenemeyen metin None
+    try:
+        return summarize_texts(texts)
+    except Exception as exc:
+        logger.error(f"Batch summarization failed, summarizing notes one by one: {str(exc)}")
+    summaries = []
+    for text in texts:
+        try:
+            summaries.append(summarize_texts([text])[0])
+        except Exception as exc:
+            logger.error(f"Error summarizing note text: {str(exc)}")
+            summaries.append(None)
+    return summaries
+
+
+def summary_row(note_id: str, summary: Optional[str], now: datetime) -> dict:
+    # summary None: not özetlenemedi, batch'in geri kalanı tamamlanırken bu not FAILED olur
+    if summary is None:
+        return {"id": note_id, "summary": "", "status": Status.FAILED, "updated_at": now}
+    return {"id": note_id, "summary": summary, "status": Status.COMPLETED, "updated_at": now}
+
+
+ClaimedNote = namedtuple("ClaimedNote", ["id", "user_id", "length", "raw_text", "compressed", "created_at"])
+
+
+def observe_queue_wait(claimed: List[ClaimedNote]) -> None:
+    # not oluşturma -> claim; lane not uzunluğundan (outbox_crud.summary_lane ile aynı kural)
+    now = datetime.now(timezone.utc)
+    for row in claimed:
+        created_at = row.created_at if row.created_at.tzinfo else row.created_at.replace(tzinfo=timezone.utc)
+        SUMMARY_QUEUE_WAIT.labels(summary_lane(row.length)).observe(max((now - created_at).total_seconds(), 0))
+
+
+def claim_queued_notes(db: Session, note_ids: Optional[List[str]], limit: int) -> List[ClaimedNote]:
+    # QUEUED notlar tek statement ile IN_PROGRESS yapılır ve (id, user_id, length, raw_text, compressed) döner.
+    # Büyük notların text'i dönmez (NULL), stream edilerek okunur.
+    # Sıkıştırılmış (note_bodies) küçük notların text'i burada açılır.
+    # SKIP LOCKED sayesinde paralel batch'ler aynı notu almaz.
+    # updated_at claim anıdır: task bitmeden ölürse maintenance (requeue_stale_claims) notu
+    # SUMMARY_CLAIM_TIMEOUT_SECONDS sonra tekrar QUEUED yapar.
+    candidates = select(Note.id).where(Note.status == Status.QUEUED)
+    if note_ids:
+        candidates = candidates.where(Note.id.in_(note_ids))
+    candidates = candidates.order_by(Note.created_at).limit(limit).with_for_update(skip_locked=True)
+
+    text_length = note_text_length()
+    compressed = select(NoteBody.note_id).where(NoteBody.note_id == Note.id).exists()
+    claimed = db.execute(
+        update(Note)
+        .where(Note.id.in_(candidates.scalar_subquery()))
+        .values(status=Status.IN_PROGRESS, updated_at=datetime.now(timezone.utc))
+        .returning(
+            Note.id,
+            Note.user_id,
+            text_length.label("length"),
+            case((text_length <= settings.SUMMARY_STREAM_THRESHOLD_CHARS, Note.raw_text), else_=None).label("raw_text"),
+            compressed.label("compressed"),
+            Note.created_at,
+        )
+    ).all()
+    record_stat_changes(db, [c for row in claimed for c in status_change(row.user_id, Status.QUEUED, Status.IN_PROGRESS)])
+    db.commit()
+
+    bodies = load_note_bodies(db, [row.id for row in claimed if row.compressed and row.raw_text is not None])
+    return [ClaimedNote(row.id, row.user_id, row.length, bodies.get(row.id, row.raw_text), bool(row.compressed), row.created_at) for row in claimed]
+
+
+def iter_note_text(db: Session, note_id: str, length: int, compressed: bool = False) -> Iterator[str]:
+    # note text'i DB'den substr ile chunk chunk okunur, worker'da tamamı tutulmaz
+    chunk_size = settings.SUMMARY_STREAM_CHUNK_CHARS
+    if compressed:
+        # sıkıştırılmış blob okunur, açılması chunk chunk yapılır
+        data = db.execute(select(NoteBody.data).where(NoteBody.note_id == note_id)).scalar_one()
+        yield from iter_decompressed(data, chunk_size)
+        return
+    for offset in range(1, length + 1, chunk_size):
+        yield db.execute(select(func.substr(Note.raw_text, offset, chunk_size)).where(Note.id == note_id)).scalar_one()
+
+
+@celery_app.task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60}, name='worker.summarize_notes_batch')
+def summarize_notes_batch(self, note_ids: Optional[List[str]] = None, limit: Optional[int] = None) -> int:
+    # note_ids verilmezse sıradaki QUEUED notlardan en fazla limit kadarı alınır
+    limit = limit or max(len(note_ids or []), settings.SUMMARY_BATCH_SIZE)
+    db = get_db_session()
+    claimed_ids: List[str] = []
+    try:
+        claimed = claim_queued_notes(db, note_ids, limit)
+        claimed_ids = [row.id for row in claimed]
+        if not claimed:
+            logger.info("No queued notes to summarize")
+            return 0
+        logger.info(f"Claimed {len(claimed)} notes for summarization")
+        observe_queue_wait(claimed)
+        user_ids = {row.id: row.user_id for row in claimed}
+        created_at = {row.id: row.created_at for row in claimed}
+        publish_note_events([note_event(row.id, row.user_id, Status.IN_PROGRESS) for row in claimed])
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        small = [row for row in claimed if row.raw_text is not None]
+        large = [row for row in claimed if row.raw_text is None]
+
+        # SUMMARY_MAX_INPUT_CHARS'tan büyük notlar okunmadan FAILED yapılır
+        for row in large:
+            if row.length > settings.SUMMARY_MAX_INPUT_CHARS:
+                logger.error(f"Note {row.id} is too large to summarize ({row.length} chars)")
+                rows.append({"id": row.id, "summary": "", "status": Status.FAILED, "updated_at": now})
+        large = [row for row in large if row.length <= settings.SUMMARY_MAX_INPUT_CHARS]
+
+        # büyük notlar stream edilir: sadece aday cümleler ve sha256 digest tutulur
+        collected = {row.id: collect_sentences(iter_note_text(db, row.id, row.length, row.compressed)) for row in large}
+        db.commit()
+
+        # cache'te olan metinler özetlenmez
+        small_cached = summary_cache.get_many([row.raw_text for row in small])
+        large_keys = {note_id: summary_cache.key_for_digest(c.digest) for note_id, c in collected.items()}
+        large_cached = dict(zip(large_keys, summary_cache.get_many_by_key(list(large_keys.values()))))
+        misses = sum(1 for summary in small_cached if summary is None) + sum(1 for summary in large_cached.values() if summary is None)
+
+        # AI özetleme gecikmesi tüm batch için bir kez
+        if misses:
+            time.sleep(SIMULATED_LATENCY_SECONDS)
+
+        # cache'te olmayanlar tek seferde özetlenir (tfidf engine'de tek vectorized geçiş)
+        miss_texts = [row.raw_text for row, summary in zip(small, small_cached) if summary is None]
+        # hatalı not sadece kendisi FAILED olur (summarize_each)
+        computed = dict(zip(miss_texts, summarize_each(miss_texts))) if miss_texts else {}
+        for row, summary in zip(small, small_cached):
+            rows.append(summary_row(row.id, summary if summary is not None else computed[row.raw_text], now))
+
+        computed_large = {}
+        for note_id, collector in collected.items():
+            summary = large_cached[note_id]
+            if summary is None:
+                try:
+                    summary = computed_large[large_keys[note_id]] = summarize_collected(collector)
+                except Exception as exc:
+                    logger.error(f"Error summarizing note {note_id}: {str(exc)}")
+            rows.append(summary_row(note_id, summary, now))
+
+        # tüm summary'ler tek transaction'da bulk UPDATE (executemany) ile yazılır,
+        # search vector'leri aynı transaction'da (stream edilen büyük notlarda sadece summary)
+        db.execute(update(Note), rows)
+        small_texts = {row.id: row.raw_text for row in small}
+        index_notes(db, [(r["id"], small_texts.get(r["id"]), r["summary"]) for r in rows if r["status"] == Status.COMPLETED])
+        record_stat_changes(db, [
+            change for r in rows
+            for change in status_change(user_ids[r["id"]], Status.IN_PROGRESS, r["status"], completion_seconds(created_at[r["id"]], now))
+        ])
+        db.commit()
+        publish_note_events([note_event(r["id"], user_ids[r["id"]], r["status"], r["updated_at"]) for r in rows])
+        summary_cache.set_many({text: summary for text, summary in computed.items() if summary is not None})
+        summary_cache.set_many_by_key(computed_large)
+
+        completed = sum(1 for r in rows if r["status"] == Status.COMPLETED)
+        WORKER_NOTES.labels(Status.COMPLETED.value).inc(completed)
+        WORKER_NOTES.labels(Status.FAILED.value).inc(len(rows) - completed)
+        logger.info(f"Summarized {completed}/{len(rows)} notes ({len(claimed) - misses} from cache, {len(collected)} streamed)")
+        return completed
+
+    except Exception as exc:
+        logger.error(f"Error summarizing batch: {str(exc)}")
+        db.rollback()
+        # claim edilen notlar retry hakkı varsa tekrar QUEUED (retry'da yeniden alınır), son denemede FAILED:
+        # outbox event'i relay'de silindiği için QUEUED kalan notu tekrar gönderen olmaz
+        if claimed_ids:
+            new_status = Status.QUEUED if self.request.retries < self.max_retries else Status.FAILED
+            try:
+                now = datetime.now(timezone.utc)
+                updated = db.execute(
+                    update(Note)
+                    .where(Note.id.in_(claimed_ids), Note.status == Status.IN_PROGRESS)
+                    .values(status=new_status, updated_at=now)
+                    .returning(Note.id, Note.user_id)
+                ).all()
+                record_stat_changes(db, [c for row in updated for c in status_change(row.user_id, Status.IN_PROGRESS, new_status)])
+                db.commit()
+                publish_note_events([note_event(row.id, row.user_id, new_status, now) for row in updated])
+                if new_status == Status.FAILED:
+                    WORKER_NOTES.labels(Status.FAILED.value).inc(len(updated))
+            except Exception as db_exc:
+                logger.error(f"Failed to update note statuses: {str(db_exc)}")
+        raise self.retry(exc=exc)
+
+    finally:
+        db.close()
 
 
 if __name__ == "__main__":
     print("Starting Celery worker...")
     print("Registered tasks:")
     print("   - worker.summarize_note")
+    print("   - worker.summarize_notes_batch")
+    print(f"Pool: {settings.WORKER_POOL}, concurrency: {settings.WORKER_CONCURRENCY}, queues: {settings.WORKER_QUEUES}")
     print("")
     
-    # worker'ı başlatır
-    import __main__
-    
-    # worker'ı başlatır
-    celery_app.worker_main(['worker', '--loglevel=info', '--concurrency=1'])
+    # worker'ı başlatır (pool, concurrency, prefetch ve acks_late celery_app.conf'tan)
+    celery_app.worker_main([
+        'worker', '--loglevel=info',
+        f'--pool={settings.WORKER_POOL}', f'--concurrency={settings.WORKER_CONCURRENCY}',
+        f'--queues={settings.WORKER_QUEUES}',
+    ])
@@ -0,0 +1,110 @@
+import sys
+import os
+import logging
+import signal
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../backend')
+sys.path.insert(0, backend_path)
+
+from app.core.settings import settings
+from app.crud.note_stats_crud import reconcile_note_stats, rollup_stat_deltas
+from app.core.note_events import note_event, publish_note_events
+from app.crud.notes_crud import purge_expired_notes, requeue_stale_claims
+from app.models.notes import Status
+from app.db.session import SessionLocal
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 1.0
+
+
+def rollup_once() -> int:
+    db = SessionLocal()
+    try:
+        return rollup_stat_deltas(db)
+    finally:
+        db.close()
+
+
+def reconcile_once() -> int:
+    # her reconcile yeni session'da (Postgres'te REPEATABLE READ transaction'ı)
+    db = SessionLocal()
+    try:
+        return reconcile_note_stats(db)
+    finally:
+        db.close()
+
+
+def purge_once() -> int:
+    # NOTE_RETENTION_DAYS'ten eski notlar, tur başına en fazla NOTE_RETENTION_MAX_ROWS_PER_RUN;
+    # kalanlar bir sonraki tura (silme hızı autovacuum'un yetişebileceği seviyede kalır)
+    created_before = datetime.now(timezone.utc) - timedelta(days=settings.NOTE_RETENTION_DAYS)
+    db = SessionLocal()
+    try:
+        return purge_expired_notes(
+            db,
+            created_before,
+            batch_size=settings.NOTE_RETENTION_BATCH_SIZE,
+            max_rows=settings.NOTE_RETENTION_MAX_ROWS_PER_RUN,
+            pause_seconds=settings.NOTE_RETENTION_BATCH_PAUSE_MS / 1000,
+        )
+    finally:
+        db.close()
+
+
+def requeue_once() -> int:
+    # SUMMARY_CLAIM_TIMEOUT_SECONDS'tan uzun süredir IN_PROGRESS olan notlar kuyruğa geri döner
+    claimed_before = datetime.now(timezone.utc) - timedelta(seconds=settings.SUMMARY_CLAIM_TIMEOUT_SECONDS)
+    db = SessionLocal()
+    try:
+        requeued = requeue_stale_claims(db, claimed_before, settings.SUMMARY_REQUEUE_BATCH_SIZE)
+    finally:
+        db.close()
+    publish_note_events([note_event(note_id, user_id, Status.QUEUED) for note_id, user_id in requeued])
+    return len(requeued)
+
+
+def run() -> None:
+    # periyodik işler: note stats delta'larının toplanması, sayaçların notes'tan yeniden sayılması, yarıda kalan
+    # claim'lerin kuyruğa geri alınması ve retention.
+    # Tek instance yeterli; başlangıçta bir kez reconcile edilir (migration'dan / kesintiden sonra drift kalmaz).
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    jobs = [
+        ("note stats reconcile", reconcile_once, settings.NOTE_STATS_RECONCILE_SECONDS),
+        ("note stats rollup", rollup_once, settings.NOTE_STATS_ROLLUP_SECONDS),
+        ("stale claim requeue", requeue_once, settings.SUMMARY_REQUEUE_INTERVAL_SECONDS),
+    ]
+    if settings.NOTE_RETENTION_DAYS > 0:
+        jobs.append(("note retention purge", purge_once, settings.NOTE_RETENTION_INTERVAL_SECONDS))
+    next_run = {name: 0.0 for name, _, _ in jobs}
+    while not stopping:
+        for name, job, interval in jobs:
+            if stopping or time.monotonic() < next_run[name]:
+                continue
+            started_at = time.perf_counter()
+            try:
+                changed = job()
+                if changed:
+                    logger.info(f"{name}: {changed} rows in {time.perf_counter() - started_at:.2f}s")
+            except Exception as exc:
+                logger.error(f"{name} failed: {str(exc)}")
+            next_run[name] = time.monotonic() + interval
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    print("Starting maintenance jobs...")
+    run()
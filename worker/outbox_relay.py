@@ -0,0 +1,216 @@
+import sys
+import os
+import logging
+import signal
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../backend')
+sys.path.insert(0, backend_path)
+
+from app.core.celery_app import celery_app
+from app.core.metrics import CELERY_PUBLISH_DURATION, StatsCollector, register_collector, start_metrics_server
+from app.core.settings import settings
+from app.crud.outbox_crud import LANES, SUMMARIZE_TASK, claim_events, delete_events, get_backlog, lane_queue
+from app.db.session import SessionLocal
+from app.models.outbox import OutboxEvent
+from kombu.exceptions import ChannelError
+from sqlalchemy.orm import Session
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATS_LOG_INTERVAL_SECONDS = 30
+
+
+@dataclass
+class RelayStats:
+    batches: int = 0
+    events: int = 0
+    messages: int = 0
+    errors: int = 0
+    lag_seconds: float = 0.0  # en son taşınan batch'teki en eski event'in yaşı
+    lane_lag_seconds: Dict[str, float] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+
+    def events_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.events / elapsed if elapsed > 0 else 0.0
+
+
+stats = RelayStats()
+
+
+def build_messages(events: List[OutboxEvent]) -> List[Tuple[str, list]]:
+    # summarize event'leri birleştirilip SUMMARY_BATCH_SIZE'lık task'lara bölünür,
+    # böylece tek notluk create_note event'leri de batch olarak gider
+    note_ids: List[str] = []
+    messages: List[Tuple[str, list]] = []
+    for event in events:
+        if event.task_name == SUMMARIZE_TASK:
+            note_ids.extend(event.args[0])
+        else:
+            messages.append((event.task_name, event.args))
+
+    batch_size = settings.SUMMARY_BATCH_SIZE
+    for i in range(0, len(note_ids), batch_size):
+        messages.append((SUMMARIZE_TASK, [note_ids[i:i + batch_size]]))
+    return messages
+
+
+def event_age_seconds(created_at: datetime) -> float:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - created_at).total_seconds()
+
+
+def queue_depth(producer, queue: str) -> int:
+    # broker'daki bekleyen mesaj sayısı; kuyruk henüz yoksa 0
+    try:
+        return producer.channel.queue_declare(queue=queue, passive=True).message_count
+    except ChannelError:
+        return 0
+
+
+def take_fair_prefix(events: List[OutboxEvent], max_notes: Optional[int]) -> List[OutboxEvent]:
+    # events round robin sırasında gelir; kapasite kadar not alınır, kalanlar outbox'ta bir sonraki tura kalır
+    if max_notes is None:
+        return events
+    taken: List[OutboxEvent] = []
+    notes = 0
+    for event in events:
+        size = event.note_count
+        if taken and notes + size > max_notes:
+            break
+        taken.append(event)
+        notes += size
+    return taken
+
+
+def relay_lane(db: Session, lane: str, producer) -> int:
+    # lane kuyruğunda SUMMARY_LANE_MAX_QUEUE_DEPTH'ten fazla task birikmez (backpressure);
+    # sıra outbox'ta kullanıcılar arasında round robin ile belirlenir, FIFO broker kuyruğunda değil
+    queue = lane_queue(lane)
+    eager = celery_app.conf.task_always_eager
+    max_notes = None
+    if not eager:
+        capacity = settings.SUMMARY_LANE_MAX_QUEUE_DEPTH - queue_depth(producer, queue)
+        if capacity <= 0:
+            return 0
+        max_notes = capacity * settings.SUMMARY_BATCH_SIZE
+
+    events = take_fair_prefix(claim_events(db, settings.OUTBOX_BATCH_SIZE, lane=lane), max_notes)
+    if not events:
+        db.rollback()
+        stats.lane_lag_seconds[lane] = 0.0
+        return 0
+
+    messages = build_messages(events)
+    if eager:
+        # send_task eager mode'a uymaz; task'lar burada çalıştırılır (worker.main import edilmiş olmalı)
+        for task_name, args in messages:
+            celery_app.tasks[task_name].apply(args=args)
+    else:
+        for task_name, args in messages:
+            # enqueued_at header'ı worker'da kuyruk bekleme süresi için okunur
+            started_at = time.perf_counter()
+            celery_app.send_task(
+                task_name, args=args, queue=queue, producer=producer, headers={"enqueued_at": time.time()}
+            )
+            CELERY_PUBLISH_DURATION.labels(task_name).observe(time.perf_counter() - started_at)
+
+    # alınıp gönderilmeyen event'lerin lock'ları da commit ile bırakılır
+    delete_events(db, [event.id for event in events])
+    db.commit()
+    stats.messages += len(messages)
+    stats.lane_lag_seconds[lane] = max(event_age_seconds(event.created_at) for event in events)
+    return len(events)
+
+
+def relay_once(db: Session) -> int:
+    # her lane için bir batch event alınır (önce fast lane), tek producer bağlantısı üzerinden gönderilir,
+    # sonra silinir (lane başına bir transaction).
+    # Gönderim sonrası commit başarısız olursa event tekrar gönderilir (at-least-once);
+    # summarize_notes_batch sadece QUEUED notları aldığı için bu güvenlidir.
+    if celery_app.conf.task_always_eager:
+        relayed = sum(relay_lane(db, lane, None) for lane in LANES)
+    else:
+        with celery_app.producer_or_acquire() as producer:
+            relayed = sum(relay_lane(db, lane, producer) for lane in LANES)
+
+    stats.lag_seconds = max(stats.lane_lag_seconds.values(), default=0.0)
+    if relayed:
+        stats.batches += 1
+        stats.events += relayed
+    return relayed
+
+
+def get_relay_stats() -> dict:
+    # /metrics scrape'inde okunur; backlog için kısa bir DB sorgusu
+    db = SessionLocal()
+    try:
+        lane_backlog = {lane: get_backlog(db, lane=lane)[0] for lane in LANES}
+    finally:
+        db.close()
+    relay_stats = {
+        "batches": stats.batches,
+        "events": stats.events,
+        "messages": stats.messages,
+        "errors": stats.errors,
+        "lag_seconds": stats.lag_seconds,
+        "backlog": sum(lane_backlog.values()),
+    }
+    for lane in LANES:
+        relay_stats[f"{lane}_backlog"] = lane_backlog[lane]
+        relay_stats[f"{lane}_lag_seconds"] = stats.lane_lag_seconds.get(lane, 0.0)
+    return relay_stats
+
+
+def run() -> None:
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    register_collector(StatsCollector("outbox_relay", get_relay_stats, counters=("batches", "events", "messages", "errors")))
+    start_metrics_server(settings.OUTBOX_RELAY_METRICS_PORT)
+
+    poll_interval = settings.OUTBOX_POLL_INTERVAL_MS / 1000
+    last_stats_log = time.monotonic()
+    db = SessionLocal()
+    try:
+        while not stopping:
+            try:
+                relayed = relay_once(db)
+            except Exception as exc:
+                stats.errors += 1
+                logger.error(f"Outbox relay failed: {str(exc)}")
+                db.rollback()
+                relayed = 0
+                time.sleep(poll_interval)
+
+            # batch dolu geldiyse beklemeden devam edilir
+            if relayed < settings.OUTBOX_BATCH_SIZE:
+                time.sleep(poll_interval)
+
+            if time.monotonic() - last_stats_log >= STATS_LOG_INTERVAL_SECONDS:
+                last_stats_log = time.monotonic()
+                logger.info(
+                    f"Outbox relay: events={stats.events} messages={stats.messages} errors={stats.errors} "
+                    f"lag={stats.lag_seconds:.2f}s throughput={stats.events_per_second():.1f} events/s"
+                )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("Starting outbox relay...")
+    run()